@@ -0,0 +1,87 @@
+"""
+UniFlex encapsulation (GRC embedded python block).
+
+Replaces ether_encap (tap -> wifi direction) and ieee802_11.mac for
+multi-peer operation: the receiver address of every data frame is taken
+from the destination of the Ethernet frame, i.e. from the kernel's
+neighbor (static ARP) table managed by the agent, instead of a single
+dst_mac. The frame format follows gr-ieee802-11 (MAC header, LLC/SNAP,
+FCS included).
+"""
+
+import re
+import struct
+import zlib
+
+import numpy
+import pmt
+from gnuradio import gr
+
+ETHER_HEADER = 14
+ETHERTYPE_IPV4 = 0x0800
+LLC_SNAP_IPV4 = b'\xaa\xaa\x03\x00\x00\x00\x08\x00'
+# gr-ieee802-11 MAX_PSDU_SIZE (1528) minus MAC header and FCS, i.e. an
+# IP packet of at most 1492 bytes plus LLC/SNAP
+MAX_MSDU = 1528 - 24 - 4
+
+
+def _mac_bytes(mac):
+    # the module's set_*_mac pass the address as "['0x12', '0x34', ...]"
+    if not isinstance(mac, (list, tuple)):
+        mac = re.findall(r'0x[0-9a-fA-F]+|\d+', mac)
+    return struct.pack('6B', *[int(x, 0) if not isinstance(x, int) else x
+                               for x in mac])
+
+
+def _mac_property(name):
+    def getter(self):
+        return getattr(self, '_' + name)
+
+    def setter(self, value):
+        setattr(self, '_' + name, value)
+        setattr(self, '_' + name + '_bytes', _mac_bytes(value))
+    return property(getter, setter)
+
+
+class blk(gr.basic_block):
+
+    src_mac = _mac_property('src_mac')
+    bss_mac = _mac_property('bss_mac')
+
+    def __init__(self, src_mac=[0, 0, 0, 0, 0, 0],
+                 bss_mac=[0, 0, 0, 0, 0, 0]):
+        gr.basic_block.__init__(self, name='UniFlex Encap',
+                                in_sig=None, out_sig=None)
+        self.src_mac = src_mac
+        self.bss_mac = bss_mac
+        self._seq_nr = 0
+
+        self.message_port_register_in(pmt.intern('from tap'))
+        self.message_port_register_out(pmt.intern('phy out'))
+        self.set_msg_handler(pmt.intern('from tap'), self._from_tap)
+
+    def _from_tap(self, msg):
+        frame = bytes(bytearray(pmt.u8vector_elements(pmt.cdr(msg))))
+        if len(frame) < ETHER_HEADER:
+            return
+        ethertype = struct.unpack('!H', frame[12:14])[0]
+        # like ether_encap, only IPv4 (ARP is static)
+        if ethertype != ETHERTYPE_IPV4:
+            return
+        msdu = LLC_SNAP_IPV4 + frame[ETHER_HEADER:]
+        if len(msdu) > MAX_MSDU:
+            return
+
+        # frame control: data, duration 0, addr1 = Ethernet destination
+        header = (b'\x08\x00\x00\x00' + frame[0:6] +
+                  self._src_mac_bytes + self._bss_mac_bytes +
+                  struct.pack('<H', (self._seq_nr & 0xfff) << 4))
+        self._seq_nr += 1
+        psdu = header + msdu
+        psdu += struct.pack('<I', zlib.crc32(psdu) & 0xffffffff)
+
+        meta = pmt.dict_add(pmt.make_dict(), pmt.intern('crc_included'),
+                            pmt.PMT_T)
+        data = numpy.frombuffer(psdu, dtype=numpy.uint8)
+        self.message_port_pub(pmt.intern('phy out'),
+                              pmt.cons(meta, pmt.init_u8vector(len(data), data)))
@@ -0,0 +1,75 @@
+"""
+UniFlex interferer (GRC embedded python block).
+
+Simulated interference for the loopback PHY: adds bursts of complex
+Gaussian noise to the RX samples while the transceiver is tuned to the
+frequency of an interferer. interferers is a list of
+[freq, duty_cycle, amplitude]; freq is wired to the flow graph variable,
+so retuning the node (set_channel) moves it into or out of the
+interference.
+"""
+
+import numpy
+from gnuradio import gr
+
+# on/off pattern and noise are precomputed and played in a loop
+PATTERN_BURSTS = 1024
+NOISE_SAMPLES = 65536
+
+
+class blk(gr.sync_block):
+
+    def __init__(self, freq=0, interferers=[], burst_len=4000, seed=0):
+        gr.sync_block.__init__(self, name='UniFlex Interferer',
+                               in_sig=[numpy.complex64],
+                               out_sig=[numpy.complex64])
+        self._rng = numpy.random.RandomState(seed)
+        self.burst_len = int(burst_len)
+        self._noise = ((self._rng.randn(NOISE_SAMPLES) +
+                        1j * self._rng.randn(NOISE_SAMPLES)) /
+                       numpy.sqrt(2)).astype(numpy.complex64)
+        self._uniform = self._rng.rand(PATTERN_BURSTS)
+        self._n = 0
+        self._active = None
+        self._interferers = []
+        self._freq = freq
+        self.interferers = interferers
+
+    @property
+    def freq(self):
+        return self._freq
+
+    @freq.setter
+    def freq(self, freq):
+        self._freq = freq
+        self._select()
+
+    @property
+    def interferers(self):
+        return self._interferers
+
+    @interferers.setter
+    def interferers(self, interferers):
+        self._interferers = [list(map(float, i)) for i in interferers]
+        self._select()
+
+    def _select(self):
+        self._active = None
+        for freq, duty_cycle, amplitude in self._interferers:
+            if abs(freq - self._freq) < 1e3:
+                self._active = (self._uniform < duty_cycle, amplitude)
+
+    def work(self, input_items, output_items):
+        inp = input_items[0]
+        out = output_items[0]
+        n = len(inp)
+        out[:] = inp
+        active = self._active
+        if active is not None:
+            on, amplitude = active
+            idx = self._n + numpy.arange(n)
+            mask = on[(idx // self.burst_len) % PATTERN_BURSTS]
+            noise = self._noise[idx % NOISE_SAMPLES]
+            out[mask] += amplitude * noise[mask]
+        self._n += n
+        return n
@@ -0,0 +1,76 @@
+"""
+UniFlex IQ tap (GRC embedded python block).
+
+Copies a bounded number of RX samples into a memory-mapped snapshot
+buffer (a file on /dev/shm shared with the agent) without interrupting
+the flow graph. A capture is armed by setting the capture variable to
+the number of samples (XML-RPC set_iq_capture); while no capture is
+armed the block only consumes its input.
+
+File layout: 64 byte header (int64: seq, n_samples, done_seq) followed
+by size complex64 samples.
+"""
+
+import threading
+
+import numpy
+from gnuradio import gr
+
+HEADER_BYTES = 64
+
+
+class blk(gr.sync_block):
+
+    def __init__(self, path='/dev/shm/uniflex_iq', size=4194304, capture=0):
+        gr.sync_block.__init__(self, name='UniFlex IQ Tap',
+                               in_sig=[numpy.complex64], out_sig=None)
+        self.path = path
+        self.size = size
+        self._lock = threading.Lock()
+        self._header = None
+        self._data = None
+        self._seq = 0
+        self._pos = 0
+        self._remaining = 0
+        self.capture = capture
+
+    @property
+    def capture(self):
+        return self._remaining
+
+    @capture.setter
+    def capture(self, n_samples):
+        n_samples = int(n_samples)
+        if n_samples <= 0 or self._header is None:
+            return
+        with self._lock:
+            self._seq += 1
+            self._pos = 0
+            self._remaining = min(n_samples, self.size)
+            self._header[0] = self._seq
+            self._header[1] = 0
+
+    def start(self):
+        buf = numpy.memmap(self.path, dtype=numpy.uint8, mode='w+',
+                           shape=(HEADER_BYTES + 8 * self.size,))
+        self._header = buf[:HEADER_BYTES].view(numpy.int64)
+        self._data = buf[HEADER_BYTES:].view(numpy.complex64)
+        return True
+
+    def stop(self):
+        self._header = None
+        self._data = None
+        return True
+
+    def work(self, input_items, output_items):
+        n = len(input_items[0])
+        if self._remaining:
+            with self._lock:
+                k = min(self._remaining, n)
+                self._data[self._pos:self._pos + k] = input_items[0][:k]
+                self._pos += k
+                self._remaining -= k
+                self._header[1] = self._pos
+                if not self._remaining:
+                    self._header[2] = self._seq
+        return n
@@ -0,0 +1,197 @@
+"""
+UniFlex notifier (GRC embedded python block).
+
+Publishes parameter changes and periodic PHY/MAC counters (in total and
+per neighbor MAC address) of the transceiver as JSON messages on a
+ZeroMQ PUB socket. Frames lost on the way from a neighbor are counted
+from the gaps in its 802.11 sequence numbers (rx_lost). Parameters are
+wired to the flow graph variables, so every set_* call on the top block
+(XML-RPC) updates the corresponding property below and is pushed to the
+subscribers immediately.
+"""
+
+import json
+import threading
+import time
+
+import pmt
+import zmq
+from gnuradio import gr
+
+PARAMS = ['freq', 'samp_rate', 'rx_gain', 'tx_gain', 'encoding',
+          'chan_est', 'lo_offset', 'src_mac', 'dst_mac', 'bss_mac']
+
+
+def _notifying(name):
+    def getter(self):
+        return self._params.get(name)
+
+    def setter(self, value):
+        self._params[name] = value
+        self._publish({'type': 'param', 'params': {name: value}})
+    return property(getter, setter)
+
+
+class blk(gr.basic_block):
+
+    freq = _notifying('freq')
+    samp_rate = _notifying('samp_rate')
+    rx_gain = _notifying('rx_gain')
+    tx_gain = _notifying('tx_gain')
+    encoding = _notifying('encoding')
+    chan_est = _notifying('chan_est')
+    lo_offset = _notifying('lo_offset')
+    src_mac = _notifying('src_mac')
+    dst_mac = _notifying('dst_mac')
+    bss_mac = _notifying('bss_mac')
+
+    def __init__(self, address='ipc:///tmp/uniflex_wifi_gnuradio',
+                 interval=1.0, freq=0, samp_rate=0, rx_gain=0, tx_gain=0,
+                 encoding=0, chan_est=0, lo_offset=0,
+                 src_mac=[], dst_mac=[], bss_mac=[]):
+        gr.basic_block.__init__(self, name='UniFlex Notifier',
+                                in_sig=None, out_sig=None)
+        self._params = {}
+        self._lock = threading.Lock()
+        self._socket = None
+        self._thread = None
+        self._running = False
+        # last sequence number per transmitter, kept across intervals
+        self._last_seq = {}
+        self._reset_counters()
+
+        self.address = address
+        self.interval = interval
+        self.freq = freq
+        self.samp_rate = samp_rate
+        self.rx_gain = rx_gain
+        self.tx_gain = tx_gain
+        self.encoding = encoding
+        self.chan_est = chan_est
+        self.lo_offset = lo_offset
+        self.src_mac = src_mac
+        self.dst_mac = dst_mac
+        self.bss_mac = bss_mac
+
+        self.message_port_register_in(pmt.intern('rx'))
+        self.message_port_register_in(pmt.intern('tx'))
+        self.set_msg_handler(pmt.intern('rx'), self._on_rx)
+        self.set_msg_handler(pmt.intern('tx'), self._on_tx)
+
+    def start(self):
+        # the socket is only opened when the flow graph runs, GRC creates
+        # an instance of this block while generating the python code
+        context = zmq.Context.instance()
+        with self._lock:
+            self._socket = context.socket(zmq.PUB)
+            self._socket.setsockopt(zmq.LINGER, 0)
+            self._socket.bind(self.address)
+        self._running = True
+        self._thread = threading.Thread(target=self._stats_loop)
+        self._thread.daemon = True
+        self._thread.start()
+        self._publish({'type': 'param', 'params': dict(self._params)})
+        return True
+
+    def stop(self):
+        self._running = False
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+        return True
+
+    def _reset_counters(self):
+        self._rx_frames = 0
+        self._rx_bytes = 0
+        self._tx_frames = 0
+        self._tx_bytes = 0
+        self._snr_sum = 0.0
+        self._snr_cnt = 0
+        self._neighbors = {}
+
+    def _neighbor(self, addr):
+        mac = ':'.join('{:02x}'.format(b) for b in addr)
+        nb = self._neighbors.get(mac)
+        if nb is None:
+            nb = {'rx_frames': 0, 'rx_bytes': 0, 'rx_lost': 0,
+                  'tx_frames': 0, 'tx_bytes': 0, 'snr': None,
+                  'encoding': None}
+            self._neighbors[mac] = nb
+        return nb
+
+    def _on_rx(self, msg):
+        meta = pmt.car(msg)
+        frame = pmt.u8vector_elements(pmt.cdr(msg))
+        snr = pmt.dict_ref(meta, pmt.intern('snr'), pmt.PMT_NIL)
+        encoding = pmt.dict_ref(meta, pmt.intern('encoding'), pmt.PMT_NIL)
+        with self._lock:
+            self._rx_frames += 1
+            self._rx_bytes += len(frame)
+            if not pmt.is_null(snr):
+                self._snr_sum += pmt.to_double(snr)
+                self._snr_cnt += 1
+            if len(frame) >= 16:
+                # addr2: transmitter
+                nb = self._neighbor(frame[10:16])
+                nb['rx_frames'] += 1
+                nb['rx_bytes'] += len(frame)
+                if not pmt.is_null(snr):
+                    nb['snr'] = pmt.to_double(snr)
+                if not pmt.is_null(encoding):
+                    nb['encoding'] = pmt.to_long(encoding)
+                if len(frame) >= 24:
+                    self._count_lost(nb, frame)
+
+    def _count_lost(self, nb, frame):
+        # sequence control: 12 bit sequence number above the fragment
+        # number; a repeated number is a duplicate, a jump of more than
+        # half the sequence space a restart of the transmitter
+        mac = ':'.join('{:02x}'.format(b) for b in frame[10:16])
+        seq = (frame[22] | (frame[23] << 8)) >> 4
+        last = self._last_seq.get(mac)
+        self._last_seq[mac] = seq
+        if last is None:
+            return
+        gap = (seq - last) % 4096
+        if 0 < gap < 2048:
+            nb['rx_lost'] += gap - 1
+
+    def _on_tx(self, msg):
+        frame = pmt.u8vector_elements(pmt.cdr(msg))
+        with self._lock:
+            self._tx_frames += 1
+            self._tx_bytes += len(frame)
+            if len(frame) >= 10:
+                # addr1: receiver
+                nb = self._neighbor(frame[4:10])
+                nb['tx_frames'] += 1
+                nb['tx_bytes'] += len(frame)
+
+    def _stats_loop(self):
+        last = time.time()
+        while self._running:
+            time.sleep(self.interval)
+            now = time.time()
+            with self._lock:
+                stats = {
+                    'type': 'stats',
+                    'interval': now - last,
+                    'rx_frames': self._rx_frames,
+                    'rx_bytes': self._rx_bytes,
+                    'tx_frames': self._tx_frames,
+                    'tx_bytes': self._tx_bytes,
+                    'snr': (self._snr_sum / self._snr_cnt
+                            if self._snr_cnt else None),
+                    'neighbors': self._neighbors,
+                }
+                self._reset_counters()
+            last = now
+            self._publish(stats)
+
+    def _publish(self, msg):
+        msg['time'] = time.time()
+        data = json.dumps(msg).encode('utf-8')
+        with self._lock:
+            if self._socket is not None:
+                self._socket.send(data)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python2
+# -*- coding: utf-8 -*-
+##################################################
+# Offline decode benchmark of the WiFi receive chain.
+#
+# Feeds wifi_phy_hier from a recorded IQ file (complex64, e.g. taken
+# from a running node with python -m uniflex_module_wifi_gnuradio.iq)
+# as fast as possible and reports
+# - decoded frames per second,
+# - CPU time per sample,
+# - decode success rate, estimated from the gaps in the 802.11 sequence
+#   numbers of each transmitter (repeated sequence numbers, i.e.
+#   retransmissions, are counted as duplicates, not as decoded frames).
+##################################################
+
+import os
+import sys
+sys.path.append(os.environ.get('GRC_HIER_PATH', os.path.expanduser('~/.grc_gnuradio')))
+
+import json
+import resource
+import struct
+import threading
+import time
+from optparse import OptionParser
+
+import pmt
+from gnuradio import blocks
+from gnuradio import gr
+from wifi_phy_hier import wifi_phy_hier  # grc-generated hier_block
+
+
+class frame_counter(gr.basic_block):
+    """Counts decoded MAC frames and tracks the sequence numbers per sender."""
+
+    def __init__(self):
+        gr.basic_block.__init__(self, name='frame_counter',
+                                in_sig=None, out_sig=None)
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.duplicates = 0
+        self.seqnos = {}
+        self.message_port_register_in(pmt.intern('in'))
+        self.set_msg_handler(pmt.intern('in'), self.handle)
+
+    def handle(self, msg):
+        frame = bytearray(pmt.u8vector_elements(pmt.cdr(msg)))
+        if len(frame) < 24:
+            # no sequence number (e.g. ACK), not part of the estimate
+            return
+        sender = bytes(frame[10:16])
+        seqno = struct.unpack('<H', bytes(frame[22:24]))[0] >> 4
+        with self.lock:
+            seqnos = self.seqnos.setdefault(sender, [])
+            if seqnos and seqnos[-1] == seqno:
+                self.duplicates += 1
+                return
+            self.frames += 1
+            seqnos.append(seqno)
+
+    def expected_frames(self):
+        # frames sent = span of the sequence numbers (mod 4096) per sender;
+        # consecutive entries differ, duplicates are dropped in handle. A
+        # jump of more than half the sequence space is a restart of the
+        # transmitter (as in uniflex_notifier.py), not lost frames
+        expected = 0
+        with self.lock:
+            for seqnos in self.seqnos.values():
+                span = 1
+                for prev, cur in zip(seqnos, seqnos[1:]):
+                    gap = (cur - prev) % 4096
+                    span += gap if gap < 2048 else 1
+                expected += span
+        return expected
+
+
+class uniflex_wifi_replay(gr.top_block):
+
+    def __init__(self, filename, samp_rate=5e6, freq=5890000000,
+                 chan_est=0, sensitivity=0.56):
+        gr.top_block.__init__(self, "Uniflex Wifi Replay")
+
+        self.n_samples = os.path.getsize(filename) // gr.sizeof_gr_complex
+
+        self.blocks_file_source_0 = blocks.file_source(gr.sizeof_gr_complex*1, filename, False)
+        self.wifi_phy_hier_0 = wifi_phy_hier(
+            bandwidth=samp_rate,
+            chan_est=chan_est,
+            encoding=0,
+            frequency=freq,
+            sensitivity=sensitivity,
+        )
+        self.blocks_null_sink_0 = blocks.null_sink(gr.sizeof_gr_complex*1)
+        self.frame_counter_0 = frame_counter()
+
+        self.connect((self.blocks_file_source_0, 0), (self.wifi_phy_hier_0, 0))
+        self.connect((self.wifi_phy_hier_0, 0), (self.blocks_null_sink_0, 0))
+        self.msg_connect((self.wifi_phy_hier_0, 'mac_out'), (self.frame_counter_0, 'in'))
+
+    def samples_read(self):
+        return self.blocks_file_source_0.nitems_written(0)
+
+
+def cpu_time():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(tb, poll_interval=0.05):
+    # the TX part of wifi_phy_hier never finishes, so wait() would block;
+    # stop once the file is consumed and the decoder output settled
+    cpu_start = cpu_time()
+    start = time.time()
+    tb.start()
+    while tb.samples_read() < tb.n_samples:
+        time.sleep(poll_interval)
+    frames = -1
+    while frames != tb.frame_counter_0.frames:
+        frames = tb.frame_counter_0.frames
+        time.sleep(10 * poll_interval)
+    tb.stop()
+    tb.wait()
+    duration = time.time() - start
+    cpu = cpu_time() - cpu_start
+
+    expected = tb.frame_counter_0.expected_frames()
+    return {
+        'samples': tb.n_samples,
+        'duration_s': duration,
+        'samples_per_s': tb.n_samples / duration,
+        'frames': frames,
+        'duplicates': tb.frame_counter_0.duplicates,
+        'frames_per_s': frames / duration,
+        'cpu_ns_per_sample': 1e9 * cpu / tb.n_samples if tb.n_samples else None,
+        'decode_success_rate': float(frames) / expected if expected else None,
+    }
+
+
+def main():
+    parser = OptionParser(usage="%prog [options] IQ_FILE")
+    parser.add_option("--samp-rate", type="float", default=5e6)
+    parser.add_option("--freq", type="float", default=5890000000)
+    parser.add_option("--chan-est", type="int", default=0)
+    parser.add_option("--sensitivity", type="float", default=0.56)
+    parser.add_option("--output", default=None,
+                      help="write the results as JSON to this file")
+    (options, args) = parser.parse_args()
+    if len(args) != 1:
+        parser.error("IQ_FILE required")
+
+    tb = uniflex_wifi_replay(args[0], options.samp_rate, options.freq,
+                             options.chan_est, options.sensitivity)
+    result = run(tb)
+    result['realtime_factor'] = result['samples_per_s'] / options.samp_rate
+
+    for key in sorted(result):
+        print("{}: {}".format(key, result[key]))
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
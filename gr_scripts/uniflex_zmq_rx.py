@@ -0,0 +1,108 @@
+"""
+UniFlex loopback receiver (GRC embedded python block).
+
+RX side of the loopback PHY: a continuous complex64 stream at samp_rate,
+like a USRP source. The peer only pushes samples while it transmits, so
+its bursts (ZeroMQ PULL on address) are played into a stream of zeros
+paced by the wall clock; the channel model then adds the noise to every
+sample. A burst starts to play latency seconds after its first samples
+arrived, which absorbs the jitter of the sender.
+"""
+
+import collections
+import time
+
+import numpy
+import zmq
+from gnuradio import gr
+
+# samples queued beyond this many seconds are dropped (unthrottled TX)
+MAX_QUEUE_S = 1.0
+
+
+class blk(gr.sync_block):
+
+    def __init__(self, address='ipc:///tmp/uniflex_loopback_n1',
+                 samp_rate=5e6, latency=0.01):
+        gr.sync_block.__init__(self, name='UniFlex Loopback RX',
+                               in_sig=None, out_sig=[numpy.complex64])
+        self.address = address
+        self.latency = latency
+        self._socket = None
+        self._queue = collections.deque()
+        self._queued = 0
+        self._hold = 0
+        self._start = None
+        self._produced = 0
+        self.samp_rate = samp_rate
+
+    @property
+    def samp_rate(self):
+        return self._samp_rate
+
+    @samp_rate.setter
+    def samp_rate(self, samp_rate):
+        # wired to the flow graph variable, restart the pacing
+        self._samp_rate = float(samp_rate)
+        self._start = None
+
+    def start(self):
+        self._socket = zmq.Context.instance().socket(zmq.PULL)
+        self._socket.setsockopt(zmq.LINGER, 0)
+        self._socket.connect(self.address)
+        self._start = None
+        return True
+
+    def stop(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        return True
+
+    def _receive(self):
+        while True:
+            try:
+                msg = self._socket.recv(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            samples = numpy.frombuffer(msg, dtype=numpy.complex64)
+            if not self._queued:
+                # new burst, wait for the rest of it
+                self._hold = int(self.latency * self.samp_rate)
+            self._queue.append(samples)
+            self._queued += len(samples)
+        while self._queued > MAX_QUEUE_S * self.samp_rate:
+            self._queued -= len(self._queue.popleft())
+
+    def work(self, input_items, output_items):
+        out = output_items[0]
+        now = time.time()
+        if self._start is None:
+            self._start = now
+            self._produced = 0
+        # samples due until now, at least 1 ms worth
+        due = int((now - self._start) * self.samp_rate) - self._produced
+        step = max(1, int(1e-3 * self.samp_rate))
+        if due < min(step, len(out)):
+            time.sleep((min(step, len(out)) - due) / float(self.samp_rate))
+            due = min(step, len(out))
+        n = min(len(out), due)
+
+        self._receive()
+        out[:n] = 0
+        pos = 0
+        if self._hold:
+            pos = min(self._hold, n)
+            self._hold -= pos
+        while pos < n and self._queue:
+            chunk = self._queue[0]
+            k = min(len(chunk), n - pos)
+            out[pos:pos + k] = chunk[:k]
+            pos += k
+            self._queued -= k
+            if k == len(chunk):
+                self._queue.popleft()
+            else:
+                self._queue[0] = chunk[k:]
+        self._produced += n
+        return n
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import traceback
+import numpy as np
+import uniflex_module_gnuradio
+from uniflex_module_wifi_gnuradio import WiFiGnuRadioModule, LoopbackChannel
+import mock_transceiver
+
+'''
+    Control-plane latency benchmark; without framework and radio.
+
+    Starts mock_transceiver on ctrl port and drives the module methods
+    from --concurrency threads (one module instance each, like several
+    controllers). Reports throughput and p50/p99/p999 latency per method
+    and writes them to --output (JSON); the first error of a method is
+    printed with its traceback. Exits with 1 if all calls of a method
+    failed.
+'''
+
+IFACE = 'tap0'
+
+CALLS = {
+    'set_channel': lambda m, i: m.set_channel([172, 176, 180][i % 3], IFACE),
+    'get_channel': lambda m, i: m.get_channel(IFACE),
+    'set_tx_power': lambda m, i: m.set_tx_power(0.5 + 0.1 * (i % 3), IFACE),
+    'get_tx_power': lambda m, i: m.get_tx_power(IFACE),
+    'set_rx_gain': lambda m, i: m.set_rx_gain(0.5 + 0.1 * (i % 3), IFACE),
+    'get_rx_gain': lambda m, i: m.get_rx_gain(IFACE),
+    'set_bandwidth': lambda m, i: m.set_bandwidth([5e6, 10e6][i % 2], IFACE),
+    'get_bandwidth': lambda m, i: m.get_bandwidth(IFACE),
+    'set_encoding': lambda m, i: m.set_encoding(i % 8, IFACE),
+    'get_encoding': lambda m, i: m.get_encoding(IFACE),
+    'set_src_mac': lambda m, i: m.set_src_mac("12:34:56:78:90:ab"),
+    'get_src_mac': lambda m, i: m.get_src_mac(),
+    'set_dst_mac': lambda m, i: m.set_dst_mac("30:14:4a:e6:46:e4"),
+    'get_dst_mac': lambda m, i: m.get_dst_mac(),
+    'set_bss_mac': lambda m, i: m.set_bss_mac("66:66:66:66:66:66"),
+    'get_bss_mac': lambda m, i: m.get_bss_mac(),
+    'get_neighbors': lambda m, i: m.get_neighbors(),
+    'add_neighbors': lambda m, i: m.add_neighbors(
+        {'192.168.123.{}'.format(10 + i % 100): '30:14:4a:e6:47:{:02x}'.format(i % 100)}),
+    'remove_neighbors': lambda m, i: m.remove_neighbors(
+        ['192.168.123.{}'.format(10 + i % 100)]),
+    'get_neighbor': lambda m, i: m.get_neighbor('192.168.123.2'),
+    'set_mtu': lambda m, i: m.set_mtu([440, 1000, 1492][i % 3]),
+    'get_mtu': lambda m, i: m.get_mtu(),
+    'get_mss': lambda m, i: m.get_mss(),
+    'tune_mtu': lambda m, i: m.tune_mtu(fer=0.01 * (i % 10), fer_mtu=1000),
+    'set_loopback_channel': lambda m, i: m.set_loopback_channel(
+        noise_voltage=0.01 * (i % 3), freq_offset=0.0, taps=[1.0]),
+    'capture_iq': lambda m, i: m.capture_iq(4096),
+    'get_channel_selection_report': lambda m, i: m.get_channel_selection_report(),
+}
+
+
+def create_module(port):
+    # the tap device is not configured, MTU and neighbors are only
+    # stored; the loopback channel enables set_loopback_channel
+    wgm = WiFiGnuRadioModule(ctrl_socket_port=port, notify_address=None,
+                             loopback=LoopbackChannel(), auto_mtu=True,
+                             iq_capture_size=mock_transceiver.IQ_CAPTURE_SIZE)
+    # attach to the running mock instead of launching the radio program
+    wgm.gr_state = uniflex_module_gnuradio.RadioProgramState.RUNNING
+    return wgm
+
+
+def worker(wgm, method, calls, latencies, errors):
+    call = CALLS[method]
+    for i in range(calls):
+        start = time.perf_counter()
+        try:
+            call(wgm, i)
+        except Exception:
+            errors.append(traceback.format_exc())
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def run(method, modules, calls):
+    latencies = [[] for _ in modules]
+    errors = []
+    threads = [threading.Thread(target=worker,
+                                args=(wgm, method, calls, lat, errors))
+               for wgm, lat in zip(modules, latencies)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - start
+
+    lat = np.concatenate([np.asarray(l) for l in latencies]) * 1e3
+    calls = int(lat.size)
+    if not calls:
+        lat = np.array([np.nan])
+    p50, p99, p999 = np.percentile(lat, [50, 99, 99.9])
+    return {
+        'calls': calls,
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'throughput_per_s': calls / duration,
+        'p50_ms': float(p50),
+        'p99_ms': float(p99),
+        'p999_ms': float(p999),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--calls', type=int, default=500,
+                        help='calls per thread and method')
+    parser.add_argument('--setter-delay', type=float, default=0.0,
+                        help='default delay of the mock setters in seconds')
+    parser.add_argument('--delays', default='{}',
+                        help='per variable setter delays as JSON, e.g. {"freq": 0.01}')
+    parser.add_argument('--threaded', action='store_true',
+                        help='threaded mock server (the real one is serial)')
+    parser.add_argument('--methods', nargs='+', default=sorted(CALLS))
+    parser.add_argument('--output', default='bench_control_plane.json')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    server = mock_transceiver.start(port=args.port, delays=json.loads(args.delays),
+                                    default_delay=args.setter_delay,
+                                    threaded=args.threaded)
+    modules = [create_module(args.port) for _ in range(args.concurrency)]
+
+    results = {}
+    print('method,calls,errors,throughput_per_s,p50_ms,p99_ms,p999_ms')
+    for method in args.methods:
+        r = run(method, modules, args.calls)
+        results[method] = r
+        print('{},{},{},{:.1f},{:.3f},{:.3f},{:.3f}'.format(
+            method, r['calls'], r['errors'], r['throughput_per_s'], r['p50_ms'],
+            r['p99_ms'], r['p999_ms']))
+        if r['first_error']:
+            sys.stderr.write('{} failed:\n{}'.format(method, r['first_error']))
+        sys.stdout.flush()
+    server.shutdown()
+
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2,
+                  sort_keys=True)
+
+    failed = [m for m, r in results.items() if not r['calls']]
+    if failed:
+        sys.exit('All calls failed: {}'.format(', '.join(sorted(failed))))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+
+'''
+    Import and construction time of WiFiGnuRadioModule; without framework
+    and radio, UNIFLEX_PATH not needed.
+
+    Every run is a fresh interpreter: measures the import of the package
+    and of WiFiGnuRadioModule, then constructs --instances modules (like
+    an agent hosting many nodes). Reports the medians over --runs, the
+    per-instance construction time and which heavy modules got loaded,
+    and writes them to --output (JSON).
+'''
+
+HEAVY = ['sh', 'pyric', 'numpy', 'zmq', 'gnuradio']
+
+RUN = '''
+import sys, time, json, logging
+logging.disable(logging.WARNING)
+t0 = time.perf_counter()
+import uniflex_module_wifi_gnuradio
+t1 = time.perf_counter()
+from uniflex_module_wifi_gnuradio import WiFiGnuRadioModule
+t2 = time.perf_counter()
+modules = [WiFiGnuRadioModule(ctrl_socket_port=10000 + i)
+           for i in range({instances})]
+t3 = time.perf_counter()
+print(json.dumps({{
+    'import_package_ms': (t1 - t0) * 1e3,
+    'import_module_ms': (t2 - t1) * 1e3,
+    'construct_us': (t3 - t2) * 1e6 / len(modules),
+    'loaded': [m for m in {heavy} if m in sys.modules],
+}}))
+'''
+
+
+def run(instances):
+    code = RUN.format(instances=instances, heavy=HEAVY)
+    out = subprocess.check_output([sys.executable, '-c', code])
+    return json.loads(out.decode('utf-8').strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--instances', type=int, default=100)
+    parser.add_argument('--output', default='bench_import.json')
+    args = parser.parse_args()
+
+    runs = [run(args.instances) for _ in range(args.runs)]
+    results = {name: float(np.median([r[name] for r in runs]))
+               for name in ['import_package_ms', 'import_module_ms',
+                            'construct_us']}
+    results['loaded'] = runs[-1]['loaded']
+
+    print('import package: {import_package_ms:.2f} ms, '
+          'import WiFiGnuRadioModule: {import_module_ms:.2f} ms, '
+          'construct: {construct_us:.1f} us/instance'.format(**results))
+    print('heavy modules loaded: {}'.format(', '.join(results['loaded']) or '-'))
+
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2,
+                  sort_keys=True)
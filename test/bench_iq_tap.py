@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import argparse
+import threading
+from gnuradio import analog
+from gnuradio import blocks
+from gnuradio import gr
+from uniflex_module_wifi_gnuradio.iq import IqSnapshotBuffer
+
+'''
+    Cost of the IQ tap (gr_scripts/uniflex_iq_tap.py) in the RX path.
+    Req.: GnuRadio; no USRP.
+
+    A noise source runs without throttle into a null sink (stand-in for
+    wifi_phy_hier) and, except for the baseline, into the IQ tap:
+    - baseline: no tap
+    - idle: tap in the flow graph, no capture armed
+    - capturing: captures of --capture samples armed back to back
+    Reports the samples/s through the RX path per mode and the margin
+    over --samp-rate (the USRP overflows if the flow graph is slower),
+    and writes them to --output (JSON).
+'''
+
+GR_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          os.pardir, 'gr_scripts')
+
+
+def load_tap():
+    ns = {}
+    with open(os.path.join(GR_SCRIPTS, 'uniflex_iq_tap.py')) as f:
+        exec(compile(f.read(), 'uniflex_iq_tap.py', 'exec'), ns)
+    return ns['blk']
+
+
+class tap_bench(gr.top_block):
+
+    def __init__(self, path, size, tap=True):
+        gr.top_block.__init__(self, "IQ Tap Benchmark")
+        self.source = analog.noise_source_c(analog.GR_GAUSSIAN, 0.1, 0)
+        self.sink = blocks.null_sink(gr.sizeof_gr_complex)
+        self.connect(self.source, self.sink)
+        self.tap = None
+        if tap:
+            self.tap = load_tap()(path=path, size=size)
+            self.connect(self.source, self.tap)
+
+
+def capture_loop(tb, path, n_samples, running, captures):
+    buf = IqSnapshotBuffer(path)
+    while running.is_set():
+        seq = buf.seq() + 1
+        tb.tap.capture = n_samples
+        if buf.wait(seq, timeout=1.0) is not None:
+            captures.append(seq)
+    buf.close()
+
+
+def run(mode, args):
+    tb = tap_bench(args.path, args.capture, tap=mode != 'baseline')
+    running = threading.Event()
+    running.set()
+    captures = []
+    tb.start()
+    thread = None
+    if mode == 'capturing':
+        # the buffer is created when the flow graph starts
+        while not os.path.exists(args.path):
+            time.sleep(0.01)
+        thread = threading.Thread(target=capture_loop,
+                                  args=(tb, args.path, args.capture,
+                                        running, captures))
+        thread.start()
+    time.sleep(args.warmup)
+    n0, c0, t0 = tb.sink.nitems_read(0), len(captures), time.time()
+    time.sleep(args.duration)
+    n1, c1, t1 = tb.sink.nitems_read(0), len(captures), time.time()
+    running.clear()
+    if thread is not None:
+        thread.join()
+    tb.stop()
+    tb.wait()
+    rate = (n1 - n0) / (t1 - t0)
+    return {
+        'samples_per_s': rate,
+        'margin': rate / args.samp_rate,
+        'captures': c1 - c0,
+        'captured_samples_per_s': (c1 - c0) * args.capture / (t1 - t0),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samp-rate', type=float, default=20e6)
+    parser.add_argument('--capture', type=int, default=1 << 20,
+                        help='samples per capture (and buffer size)')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=1.0)
+    parser.add_argument('--path', default='/dev/shm/uniflex_iq_bench')
+    parser.add_argument('--output', default='bench_iq_tap.json')
+    args = parser.parse_args()
+
+    results = {}
+    print('mode,samples_per_s,margin,captures')
+    for mode in ['baseline', 'idle', 'capturing']:
+        r = run(mode, args)
+        results[mode] = r
+        print('{},{:.0f},{:.2f},{}'.format(mode, r['samples_per_s'],
+                                           r['margin'], r['captures']))
+    if os.path.exists(args.path):
+        os.remove(args.path)
+
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2,
+                  sort_keys=True)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import argparse
+import subprocess
+import xmlrpc.client
+from uniflex_module_wifi_gnuradio import mtu as mtu_model
+from uniflex_module_wifi_gnuradio import traffic
+
+'''
+    End-to-end IP throughput/latency benchmark through tap0.
+    Req.:
+    - two transceivers on a loopback channel, e.g. two agents with
+      WiFiGnuRadioModule(loopback=...) configured with
+      LoopbackChannel.pair(); the second one in its own network
+      namespace (ip netns exec n1 ...) so that both can use tap0
+    - on the peer: python3 bench_loopback_throughput.py server
+    - locally: python3 bench_loopback_throughput.py client 192.168.123.2
+
+    Only the local TX encoding is changed, the receiver detects the
+    encoding from the SIGNAL field of each frame. The local tap MTU is
+    changed per run (root), the transceiver has to be started with
+    auto_mtu=True (flow graph built for the largest MTU) to test MTUs
+    above the configured one.
+
+    For each encoding the MTU with the best measured goodput is compared
+    to the one selected by the goodput model (mtu.best_mtu) from the
+    delivery ratio measured at the largest MTU.
+'''
+
+ENCODINGS = ['BPSK 1/2', 'BPSK 3/4', 'QPSK 1/2', 'QPSK 3/4',
+             '16QAM 1/2', '16QAM 3/4', '64QAM 2/3', '64QAM 3/4']
+
+
+def client(args):
+    ctrl = xmlrpc.client.ServerProxy('http://localhost:{}'.format(args.ctrl_port))
+    probe = traffic.UdpProbe(args.peer, args.port)
+
+    samp_rate = float(ctrl.get_samp_rate())
+    best = []
+    print('encoding,mtu,goodput_bps,delivery_ratio,rtt_p50_ms,rtt_p99_ms')
+    for encoding in args.encodings:
+        ctrl.set_encoding(encoding)
+        results = {}
+        for mtu in sorted(args.mtus):
+            subprocess.check_call(['ip', 'link', 'set', 'dev', args.iface,
+                                   'mtu', str(mtu)])
+            goodput, ratio = probe.throughput(mtu, args.duration, args.rate)
+            rtts = probe.latency(args.pings)
+            p50 = traffic.percentile(rtts, 0.5)
+            p99 = traffic.percentile(rtts, 0.99)
+            results[mtu] = (goodput or 0, ratio or 0)
+            print('{},{},{},{},{},{}'.format(
+                ENCODINGS[encoding], mtu,
+                None if goodput is None else int(goodput),
+                None if ratio is None else round(ratio, 4),
+                None if p50 is None else round(p50 * 1e3, 2),
+                None if p99 is None else round(p99 * 1e3, 2)))
+            sys.stdout.flush()
+
+        ref_mtu = max(results)
+        model_mtu = mtu_model.best_mtu(encoding, 1.0 - results[ref_mtu][1],
+                                       ref_mtu, samp_rate,
+                                       candidates=results.keys())
+        measured_mtu = max(results, key=lambda mtu: results[mtu][0])
+        best.append((encoding, measured_mtu, model_mtu))
+
+    print('encoding,best_mtu_measured,best_mtu_model')
+    for encoding, measured_mtu, model_mtu in best:
+        print('{},{},{}'.format(ENCODINGS[encoding], measured_mtu, model_mtu))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('mode', choices=['server', 'client'])
+    parser.add_argument('peer', nargs='?', default='192.168.123.2')
+    parser.add_argument('--port', type=int, default=traffic.PORT)
+    parser.add_argument('--ctrl-port', type=int, default=8080)
+    parser.add_argument('--encodings', type=int, nargs='+',
+                        default=list(range(len(ENCODINGS))))
+    parser.add_argument('--iface', default='tap0')
+    parser.add_argument('--mtus', type=int, nargs='+',
+                        default=[440, 750, 1000, 1250, 1492])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--rate', type=float, default=500.0,
+                        help='offered load in packets/s')
+    parser.add_argument('--pings', type=int, default=100)
+    args = parser.parse_args()
+
+    if args.mode == 'server':
+        traffic.serve(args.port)
+    else:
+        client(args)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import time
+import argparse
+from uniflex_module_wifi_gnuradio import WiFiGnuRadioModule
+from uniflex_module_wifi_gnuradio import traffic
+
+'''
+    Channel selection against simulated interferers; without framework.
+    Req.:
+    - GnuRadio, GR80211 module and gr-zeromq installed, UNIFLEX_PATH set
+    - the peer node on the other end of the loopback channel in network
+      namespace n1 running traffic.serve() (see sweep_loopback.py)
+
+    Starts on --channel with an interferer on it (and a weaker one on
+    the next candidate), loads the link with UDP traffic and prints the
+    channel selection report (migrations and goodput gain).
+'''
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--channels', type=int, nargs='+', default=[172, 176, 180])
+    parser.add_argument('--channel', type=int, default=172)
+    parser.add_argument('--interferers', default='{"172": [0.6, 0.5], "176": [0.2, 0.5]}',
+                        help='{channel: [duty_cycle, amplitude]} as JSON')
+    parser.add_argument('--interval', type=float, default=5.0)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--rate', type=float, default=500.0, help='packets/s')
+    args = parser.parse_args()
+
+    loopback = {'tx_address': 'ipc:///tmp/uniflex_loopback_n0',
+                'rx_address': 'ipc:///tmp/uniflex_loopback_n1',
+                'interferers': json.loads(args.interferers)}
+    selection = {'channels': args.channels, 'interval': args.interval}
+    wgm = WiFiGnuRadioModule(loopback=loopback, channel_selection=selection,
+                             notify_interval=0.5, iq_capture_size=1 << 20)
+    wgm._activate_rp()
+    wgm.set_channel(args.channel, wgm.tap_iface)
+
+    probe = traffic.UdpProbe(wgm.dst_ipv4_address)
+    try:
+        probe.throughput(wgm.get_mtu(), args.duration, args.rate)
+        time.sleep(args.interval)
+        print('channel', wgm.get_channel(wgm.tap_iface))
+        print(json.dumps(wgm.get_channel_selection_report(), indent=2))
+    finally:
+        probe.close()
+        wgm.deactivate_radio_program()
@@ -0,0 +1,2 @@
+# test_wifi_gnuradio.py drives a real GNU Radio module, run it directly
+collect_ignore = ["test_wifi_gnuradio.py"]
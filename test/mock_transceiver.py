@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import argparse
+import threading
+import numpy as np
+from socketserver import ThreadingMixIn
+from xmlrpc.server import SimpleXMLRPCServer
+
+'''
+    Stand-in for the XML-RPC interface of uniflex_wifi_transceiver.
+    Provides get_<var>/set_<var> for the flow graph variables; every
+    setter can be given a delay emulating the work done by the real
+    callbacks (e.g. retuning the USRP in set_freq). The loopback channel
+    variables are included, and set_iq_capture fills the IQ snapshot
+    buffer like the IQ tap (gr_scripts/uniflex_iq_tap.py) with noise.
+'''
+
+# see gr_scripts/uniflex_iq_tap.py
+HEADER_BYTES = 64
+IQ_CAPTURE_SIZE = 4194304
+
+VARIABLES = {
+    'usrp_addr': "addr=192.168.10.2",
+    'tx_gain': 0.75,
+    'src_mac': [0x30, 0x14, 0x4a, 0xe6, 0x46, 0xe4],
+    'samp_rate': 5e6,
+    'rx_gain': 0.75,
+    'lo_offset': 0,
+    # float, XML-RPC cannot marshal ints above 2**31
+    'freq': 5890000000.0,
+    'encoding': 0,
+    'dst_mac': [0x12, 0x34, 0x56, 0x78, 0x90, 0xab],
+    'chan_est': 0,
+    'bss_mac': [0x42, 0x42, 0x42, 0x42, 0x42, 0x42],
+    # loopback channel and IQ tap
+    'chan_noise_voltage': 0.0,
+    'chan_freq_offset': 0.0,
+    'chan_taps': [1.0],
+    'iq_capture': 0,
+}
+
+
+class MockTransceiver(object):
+
+    def __init__(self, delays=None, default_delay=0.0, iq_capture_path=None,
+                 iq_capture_size=IQ_CAPTURE_SIZE):
+        self.variables = dict(VARIABLES)
+        self.delays = delays if delays is not None else {}
+        self.default_delay = default_delay
+        self.lock = threading.Lock()
+        self.iq_header = None
+        if iq_capture_path is not None:
+            buf = np.memmap(iq_capture_path, dtype=np.uint8, mode='w+',
+                            shape=(HEADER_BYTES + 8 * iq_capture_size,))
+            self.iq_header = buf[:HEADER_BYTES].view(np.int64)
+            self.iq_data = buf[HEADER_BYTES:].view(np.complex64)
+            noise = np.random.RandomState(0).randn(2 * iq_capture_size)
+            self.iq_data[:] = (0.01 * noise).view(np.complex128)
+
+    def _capture(self, n_samples):
+        # the samples are already in place, complete the capture at once
+        n_samples = min(int(n_samples), len(self.iq_data))
+        self.iq_header[0] += 1
+        self.iq_header[1] = n_samples
+        self.iq_header[2] = self.iq_header[0]
+
+    def _dispatch(self, method, params):
+        kind, _, name = method.partition('_')
+        if name not in self.variables or kind not in ('get', 'set'):
+            raise Exception('method "{}" is not supported'.format(method))
+        if kind == 'get':
+            return self.variables[name]
+        delay = self.delays.get(name, self.default_delay)
+        if delay:
+            time.sleep(delay)
+        with self.lock:
+            self.variables[name] = params[0]
+            if name == 'iq_capture' and self.iq_header is not None:
+                self._capture(params[0])
+
+
+class ThreadingXMLRPCServer(ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+
+def start(host='localhost', port=8080, delays=None, default_delay=0.0,
+          threaded=False, iq_capture_path='/dev/shm/uniflex_iq_{port}'):
+    # the generated flow graph uses a plain (serial) SimpleXMLRPCServer
+    server_cls = ThreadingXMLRPCServer if threaded else SimpleXMLRPCServer
+    server = server_cls((host, port), allow_none=True, logRequests=False)
+    if iq_capture_path is not None:
+        iq_capture_path = iq_capture_path.format(port=port)
+    server.register_instance(MockTransceiver(delays, default_delay,
+                                             iq_capture_path))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='default setter delay in seconds')
+    parser.add_argument('--threaded', action='store_true')
+    args = parser.parse_args()
+
+    server = start(port=args.port, default_delay=args.delay,
+                   threaded=args.threaded)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import argparse
+from uniflex_module_wifi_gnuradio import WiFiGnuRadioModule
+from uniflex_module_wifi_gnuradio.experiment import ParameterSweep
+
+'''
+    Parameter sweep against a simulated flow graph; without framework.
+    Req.:
+    - GnuRadio, GR80211 module and gr-zeromq installed, UNIFLEX_PATH set
+    - the peer node: a second transceiver on the other end of the
+      loopback channel in network namespace n1, e.g.
+      ip netns exec n1 <agent with WiFiGnuRadioModule(loopback=n1, ...)>
+      ip netns exec n1 python3 -c \\
+          "from uniflex_module_wifi_gnuradio import traffic; traffic.serve()"
+
+    Writes the results as columns to a .npz file.
+'''
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--grid', default='{"encoding": [0, 1, 2, 3, 4, 5, 6, 7]}',
+                        help='parameter grid as JSON')
+    parser.add_argument('--harder', default='{"encoding": 1}',
+                        help='direction in which each parameter degrades the link')
+    parser.add_argument('--noise', type=float, default=0.0)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--output', default='sweep.npz')
+    args = parser.parse_args()
+
+    loopback = {'tx_address': 'ipc:///tmp/uniflex_loopback_n0',
+                'rx_address': 'ipc:///tmp/uniflex_loopback_n1',
+                'noise_voltage': args.noise}
+    wgm = WiFiGnuRadioModule(loopback=loopback, notify_address=None)
+    wgm._activate_rp()
+
+    try:
+        sweep = ParameterSweep(wgm, json.loads(args.grid), wgm.dst_ipv4_address,
+                               harder=json.loads(args.harder),
+                               duration=args.duration)
+        results = sweep.run()
+        ParameterSweep.save(results, args.output)
+        for name, column in results.items():
+            print(name, column)
+    finally:
+        wgm.deactivate_radio_program()
@@ -0,0 +1,63 @@
+import json
+import numpy as np
+import pytest
+from uniflex_module_wifi_gnuradio.calibration import (GainCalibration,
+                                                      TxPowerController)
+
+FREQS = [5.8e9, 6.0e9]
+GAINS = [0.0, 0.5, 1.0]
+DBM = [[-20.0, -5.0, 10.0], [-22.0, -7.0, 8.0]]
+
+
+def test_load_json_and_csv(tmp_path):
+    path = tmp_path / 'tx.json'
+    path.write_text(json.dumps({'freqs': FREQS, 'gains': GAINS, 'dbm': DBM}))
+    cal = GainCalibration.load(str(path))
+    assert np.array_equal(cal.dbm, DBM)
+
+    path = tmp_path / 'tx.csv'
+    rows = ['freq,gain,dbm'] + ['{},{},{}'.format(f, g, DBM[i][j])
+                                for i, f in enumerate(FREQS)
+                                for j, g in enumerate(GAINS)]
+    path.write_text('\n'.join(reversed(rows[1:])) + '\n')
+    cal = GainCalibration.load(str(path))
+    assert np.array_equal(cal.freqs, FREQS)
+    assert np.array_equal(cal.dbm, DBM)
+
+    path.write_text('\n'.join(rows[:-1]) + '\n')
+    with pytest.raises(ValueError):
+        GainCalibration.load(str(path))
+
+
+def test_invalid_table():
+    with pytest.raises(ValueError):
+        GainCalibration(FREQS, GAINS, DBM[:1])
+    with pytest.raises(ValueError):
+        GainCalibration(FREQS, GAINS, [[0, 0, 1], [0, 1, 2]])
+
+
+def test_conversions():
+    cal = GainCalibration(FREQS, GAINS, DBM)
+    assert cal.to_dbm(5.8e9, 0.5) == -5.0
+    assert cal.to_dbm(5.9e9, 0.25) == pytest.approx(-13.5)
+    # clamped outside the table
+    assert cal.to_dbm(5.0e9, 2.0) == 10.0
+    gains = np.linspace(0, 1, 11)
+    assert np.allclose(cal.to_gain(5.9e9, cal.to_dbm(5.9e9, gains)), gains)
+    lo, hi = cal.dbm_range(FREQS)
+    assert np.array_equal(lo, [-20.0, -22.0])
+    assert np.array_equal(hi, [10.0, 8.0])
+
+
+def test_tx_power_controller():
+    ctrl = TxPowerController(target_snr=15.0, margin=2.0, step_db=1.0,
+                             min_dbm=-10.0, max_dbm=10.0)
+    # missing SNR is added at once, plus the margin
+    assert ctrl.update(0.0, 10.0) == 7.0
+    # inside the band: keep
+    assert ctrl.update(0.0, 18.0) == 0.0
+    # above: step down
+    assert ctrl.update(0.0, 25.0) == -1.0
+    assert ctrl.update(-10.0, 25.0) == -10.0
+    assert ctrl.update(5.0, 0.0) == 10.0
+    assert ctrl.update(3.0, None) == 3.0
@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+from uniflex_module_wifi_gnuradio import mtu
+from uniflex_module_wifi_gnuradio.neighbors import NeighborTable
+from uniflex_module_wifi_gnuradio.channel_selection import (OccupancyScores,
+                                                            ChannelSelector)
+
+PEER_MAC = '30:14:4a:e6:46:e4'
+
+
+class FakeModule(object):
+    """Snapshots with bursts covering duty[channel] of the windows."""
+
+    tap_iface = 'tap0'
+    iq_capture_size = 1 << 16
+
+    def __init__(self, duty, channel, noise=1e-3, amplitude=1.0):
+        self.duty = duty
+        self.channel = channel
+        self.noise = noise
+        self.amplitude = amplitude
+        self.neighbor_table = NeighborTable()
+        self.neighbor_table.add('192.168.123.2', PEER_MAC)
+        self.rng = np.random.RandomState(0)
+        self.channels = []
+
+    def get_channel(self, iface):
+        return self.channel
+
+    def set_channel(self, channel, iface):
+        self.channel = channel
+        self.channels.append(channel)
+
+    def get_parameters(self, names):
+        return {'samp_rate': mtu.SAMP_RATE}
+
+    def capture_iq(self, n_samples, analyze=True):
+        from uniflex_module_wifi_gnuradio.iq import analyze as analyze_iq
+        n_win = n_samples // 80
+        busy = self.rng.rand(n_win) < self.duty.get(self.channel, 0.0)
+        amp = np.repeat(np.where(busy, self.amplitude, 0.0), 80)
+        noise = self.noise * (self.rng.randn(n_win * 80) +
+                              1j * self.rng.randn(n_win * 80))
+        iq = (amp + noise).astype(np.complex64)
+        return iq, analyze_iq(iq, mtu.SAMP_RATE) if analyze else None
+
+
+class FakePeer(object):
+
+    def __init__(self, module):
+        self.module = module
+        self.channel = None
+
+    def set_channel(self, channel, iface):
+        # peers are switched before the node
+        assert self.module.channel != channel
+        self.channel = channel
+
+
+def stats_event(bytes_per_frame, frames=10, interval=1.0, mac=PEER_MAC):
+    class Event(object):
+        pass
+    event = Event()
+    event.interval = interval
+    event.neighbors = {mac: {'rx_frames': frames, 'rx_bytes': frames * bytes_per_frame,
+                             'tx_frames': 0, 'tx_bytes': 0, 'encoding': 0}}
+    return event
+
+
+def test_occupancy_scores():
+    scores = OccupancyScores([1, 2, 3], alpha=0.5)
+    assert scores.best() is None
+    assert scores.update(1, 0.8) == 0.8
+    assert scores.update(1, 0.4) == pytest.approx(0.6)
+    scores.update(2, 0.7)
+    assert scores.get(3) is None
+    assert scores.best() == 1
+
+
+def test_migrates_to_the_least_occupied_channel():
+    module = FakeModule({1: 0.6, 2: 0.05, 3: 0.3}, channel=1)
+    peer = FakePeer(module)
+    selector = ChannelSelector(module, [1, 2, 3], peers=[peer], dwell=0.01,
+                               settle_time=0.0)
+    selector.on_stats(stats_event(1036))
+    assert selector.evaluate() == 2
+    assert module.channel == peer.channel == 2
+    assert abs(selector.scores.get(1) - 0.6) < 0.1
+    assert abs(selector.scores.get(2) - 0.05) < 0.05
+
+    entry, = selector.report
+    assert (entry['from'], entry['to']) == (1, 2)
+    assert entry['goodput_before_bps'] == 8 * 10 * (1036 - mtu.psdu_length(0))
+
+    # goodput after the migration is filled in by the next round
+    selector.on_stats(stats_event(1036, frames=20))
+    assert selector.evaluate() == 2
+    assert entry['gain'] == 1.0
+
+
+def test_hysteresis():
+    module = FakeModule({1: 0.3, 2: 0.2}, channel=1)
+    selector = ChannelSelector(module, [1, 2], dwell=0.01, settle_time=0.0,
+                               hysteresis=0.15)
+    assert selector.evaluate() == 1
+    assert not selector.report
+    # dwell on channel 2 and back
+    assert module.channels == [2, 1]
+
+
+def test_foreign_airtime():
+    module = FakeModule({}, channel=1)
+    selector = ChannelSelector(module, [1], dwell=0.01, settle_time=0.0)
+    selector.on_stats(stats_event(1036, frames=100, mac='00:00:00:00:00:01'))
+    assert selector.evaluate() == 1
+    airtime = 100 * mtu.frame_airtime(1000, 0, mtu.SAMP_RATE, 0)
+    assert selector.scores.get(1) == pytest.approx(airtime)
+
+
+def test_fully_occupied_channel():
+    # a snapshot alone sees no idle windows, its own floor is the
+    # interference level; the floor of the idle channel applies
+    module = FakeModule({1: 1.0, 2: 0.0, 3: 0.95}, channel=1)
+    selector = ChannelSelector(module, [1, 2, 3], dwell=0.01, settle_time=0.0)
+    assert selector.evaluate() == 2
+    assert selector.scores.get(1) == 1.0
+    assert selector.scores.get(3) > 0.9
+    assert selector.scores.get(2) < 0.05
+    assert selector.noise_floor_db < -30
+
+
+def test_configured_noise_floor():
+    module = FakeModule({1: 1.0, 2: 1.0}, channel=1)
+    selector = ChannelSelector(module, [1, 2], dwell=0.01, settle_time=0.0,
+                               noise_floor_db=-40.0)
+    assert selector.evaluate() == 1
+    assert selector.scores.get(1) == selector.scores.get(2) == 1.0
+
+
+def test_settle_time_covers_the_buffered_samples():
+    from uniflex_module_wifi_gnuradio.loopback import LoopbackChannel
+    module = FakeModule({}, channel=1)
+    module.buffer_profile = 'default'
+    module.loopback = None
+    selector = ChannelSelector(module, [1, 2])
+    # one default output buffer at 5 MHz plus retuning
+    assert selector._settle_time() == pytest.approx(32768 / 5e6 + 0.005)
+    module.loopback = LoopbackChannel(latency=0.01)
+    assert selector._settle_time() == pytest.approx(2 * 32768 / 5e6 + 0.015)
+    module.buffer_profile = 'low_latency'
+    assert selector._settle_time() == pytest.approx(2 * 4096 / 5e6 + 0.015)
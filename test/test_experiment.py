@@ -0,0 +1,109 @@
+import socket
+import threading
+import numpy as np
+from uniflex_module_wifi_gnuradio import traffic
+from uniflex_module_wifi_gnuradio.experiment import ParameterSweep
+
+'''
+    ParameterSweep against traffic.serve() on 127.0.0.1; the radio link
+    is emulated by FakeModule, a UDP relay in front of the server which
+    drops everything while the link is dead.
+'''
+
+
+def free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class FakeModule(object):
+
+    tap_iface = 'tap0'
+
+    def __init__(self, server_port, dead):
+        self.dead = dead
+        self.params = {}
+        self.calls = []
+        self.server = ('127.0.0.1', server_port)
+        self.front = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.front.bind(('127.0.0.1', 0))
+        self.port = self.front.getsockname()[1]
+        self.back = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.back.connect(self.server)
+        self.client = None
+        for target in (self._uplink, self._downlink):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+
+    def _alive(self):
+        return not self.dead(self.params)
+
+    def _uplink(self):
+        while True:
+            data, self.client = self.front.recvfrom(65535)
+            if self._alive():
+                self.back.send(data)
+
+    def _downlink(self):
+        while True:
+            data = self.back.recv(65535)
+            if self._alive() and self.client is not None:
+                self.front.sendto(data, self.client)
+
+    def get_mtu(self):
+        return 440
+
+    def set_encoding(self, value, iface):
+        self.calls.append(('encoding', value))
+        self.params['encoding'] = value
+
+    def set_tx_power(self, value, iface):
+        self.calls.append(('tx_power', value))
+        self.params['tx_power'] = value
+
+
+def start_server():
+    port = free_port()
+    thread = threading.Thread(target=traffic.serve, args=(port,))
+    thread.daemon = True
+    thread.start()
+    return port
+
+
+def test_sweep():
+    # high encodings need the high TX power
+    module = FakeModule(start_server(),
+                        dead=lambda p: p.get('encoding', 0) >= 4 and
+                        p.get('tx_power', 0) < 1.0)
+    sweep = ParameterSweep(module, {'encoding': [0, 4, 6],
+                                    'tx_power': [0.5, 1.0]},
+                           '127.0.0.1', harder={'encoding': 1, 'tx_power': -1},
+                           duration=0.2, rate_pps=100, pings=5,
+                           probe_pings=1, settle_time=0.0, port=module.port)
+    results = sweep.run()
+
+    assert list(results) == ['encoding', 'tx_power', 'goodput_bps',
+                             'delivery_ratio', 'rtt_p50_ms', 'rtt_p99_ms',
+                             'skipped']
+    assert list(results['encoding']) == [0, 0, 4, 4, 6, 6]
+    assert list(results['tx_power']) == [0.5, 1.0, 0.5, 1.0, 0.5, 1.0]
+    # (4, 0.5) is dead, (6, 0.5) is at least as hard and skipped
+    assert list(results['skipped']) == [False, False, False, False, True, False]
+    alive = np.array([True, True, False, True, False, True])
+    assert np.all(results['goodput_bps'][alive] > 0)
+    assert np.all(results['delivery_ratio'][alive] > 0.9)
+    assert np.all(results['goodput_bps'][~alive] == 0)
+    assert np.all(results['rtt_p50_ms'][alive] >= 0)
+    assert np.all(np.isnan(results['rtt_p50_ms'][~alive]))
+
+    # only the parameters changing between two points are set, nothing
+    # for the skipped point
+    assert module.calls == [('encoding', 0), ('tx_power', 0.5),
+                            ('tx_power', 1.0), ('encoding', 4),
+                            ('tx_power', 0.5), ('tx_power', 1.0),
+                            ('encoding', 6)]
+
@@ -0,0 +1,95 @@
+import os
+import pytest
+from uniflex_module_wifi_gnuradio import template
+from uniflex_module_wifi_gnuradio.grc import GrcFlowGraph
+
+GR_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          os.pardir, 'gr_scripts')
+TEMPLATE = template.template_path(GR_SCRIPTS)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    template.clear_cache()
+    yield
+    template.clear_cache()
+
+
+def test_edit_and_roundtrip():
+    fg = template.load(TEMPLATE)
+    assert fg.to_xml().startswith('<?xml')
+    fg.add_block('variable', 'test_var', (0, 0), value=3)
+    fg.connect('test_var', 0, 'xmlrpc_server_0', 0)
+    fg = GrcFlowGraph(fg.to_xml())
+    assert fg.get_param('test_var', 'value') == '3'
+    assert len(list(fg.connections('test_var'))) == 1
+    with pytest.raises(ValueError):
+        fg.add_block('variable', 'test_var')
+
+    fg.disconnect('test_var', 0, 'xmlrpc_server_0', 0)
+    assert not list(fg.connections('test_var'))
+    fg.remove_block('test_var')
+    assert not fg.has_block('test_var')
+    with pytest.raises(KeyError):
+        fg.get_param('test_var', 'value')
+
+
+def test_load_returns_private_copies():
+    fg = template.load(TEMPLATE)
+    fg.set_variable('tx_gain', 0.1)
+    assert template.load(TEMPLATE).get_param('tx_gain', 'value') == '0.75'
+
+
+def test_instantiate():
+    fg = template.instantiate(template.load(TEMPLATE), 'node_n1',
+                              src_mac='12:34:56:78:90:ab',
+                              usrp_addr='addr=192.168.10.3', ctrl_port=8081,
+                              tap_iface='tap1', mtu=1492, tx_gain=0.5,
+                              buffer_profile='low_latency')
+    assert fg.block_ids('options') == ['node_n1']
+    assert fg.get_param('src_mac', 'value') == '[0x12, 0x34, 0x56, 0x78, 0x90, 0xab]'
+    assert fg.get_param('usrp_addr', 'value') == "'addr=192.168.10.3'"
+    assert fg.get_param('xmlrpc_server_0', 'port') == '8081'
+    assert fg.get_param('blocks_tuntap_pdu_0', 'ifn') == 'tap1'
+    assert fg.get_param('blocks_tuntap_pdu_0', 'mtu') == '1492'
+    assert fg.get_param('tx_gain', 'value') == '0.5'
+    # not given: template value
+    assert fg.get_param('rx_gain', 'value') == '0.75'
+    assert fg.get_param('uhd_usrp_source_0', 'maxoutbuf') == '4096'
+    assert 'num_recv_frames=32' in fg.get_param('uhd_usrp_sink_0', 'dev_args')
+
+    fg = template.instantiate(template.load(TEMPLATE))
+    assert fg.get_param('uhd_usrp_source_0', 'dev_args') == '""'
+    with pytest.raises(ValueError):
+        template.instantiate(template.load(TEMPLATE), buffer_profile='fast')
+
+
+def test_mac_literal():
+    assert template.mac_literal('0:1:a:b:c:ff') == '[0x00, 0x01, 0x0a, 0x0b, 0x0c, 0xff]'
+
+
+def test_cached(monkeypatch):
+    monkeypatch.setattr(template, 'MAX_PROGRAMS', 2)
+    generated = []
+
+    def generate(key):
+        return lambda: generated.append(key) or 'xml {}'.format(key)
+
+    assert template.cached(1, generate(1)) == 'xml 1'
+    assert template.cached(1, generate(1)) == 'xml 1'
+    template.cached(2, generate(2))
+    template.cached(1, generate(1))
+    # 2 is the least recently used
+    template.cached(3, generate(3))
+    template.cached(1, generate(1))
+    template.cached(2, generate(2))
+    assert generated == [1, 2, 3, 2]
+
+
+def test_read_source_follows_modifications(tmp_path):
+    path = tmp_path / 'block.py'
+    path.write_text('a')
+    assert template.read_source(str(path)) == 'a'
+    path.write_text('b')
+    os.utime(str(path), (0, 1))
+    assert template.read_source(str(path)) == 'b'
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from uniflex_module_wifi_gnuradio import iq
+
+
+def snapshot(duty, n_win=1000, noise=1e-3, seed=0):
+    rng = np.random.RandomState(seed)
+    busy = np.arange(n_win) < duty * n_win
+    amp = np.repeat(np.where(busy, 1.0, 0.0), 80)
+    return (amp + noise * (rng.randn(n_win * 80) +
+                           1j * rng.randn(n_win * 80))).astype(np.complex64)
+
+
+def test_window_power():
+    x = np.ones(170, dtype=np.complex64)
+    assert np.allclose(iq.window_power(x), [1.0, 1.0])
+    assert np.allclose(iq.window_power_db(2 * x, window=10), 10 * np.log10(4))
+
+
+def test_analyze():
+    summary = iq.analyze(snapshot(0.3), 5e6)
+    assert abs(summary['duty_cycle'] - 0.3) < 0.01
+    assert summary['interference_db'] > 50
+    assert summary['psd_db'].shape == summary['freqs'].shape == (64,)
+
+
+def test_analyze_short_snapshot():
+    # one complete power window
+    with pytest.raises(ValueError):
+        iq.analyze(snapshot(0.0, n_win=1)[:79], 5e6)
+    assert iq.analyze(snapshot(0.0, n_win=1), 5e6)['duty_cycle'] == 0.0
+
+
+def test_fully_occupied_snapshot():
+    idle = iq.noise_floor(iq.window_power_db(snapshot(0.0)))
+    # on its own a fully occupied snapshot looks idle
+    assert iq.analyze(snapshot(1.0), 5e6)['duty_cycle'] == 0.0
+    summary = iq.analyze(snapshot(1.0), 5e6, noise_floor_db=idle)
+    assert summary['duty_cycle'] == 1.0
+    assert summary['occupied_bw'] > 0.0
+    assert summary['noise_floor_db'] == idle
+
+
+def test_snapshot_buffer(tmp_path):
+    path = str(tmp_path / 'iq')
+    buf = np.memmap(path, dtype=np.uint8, mode='w+',
+                    shape=(iq.HEADER_BYTES + 8 * 16,))
+    header = buf[:iq.HEADER_BYTES].view(np.int64)
+    buf[iq.HEADER_BYTES:].view(np.complex64)[:] = np.arange(16)
+    header[:] = [1, 4, 1] + [0] * 5
+
+    reader = iq.IqSnapshotBuffer(path)
+    assert reader.exists() and reader.size == 16 and reader.seq() == 1
+    assert np.array_equal(reader.wait(1), np.arange(4))
+    assert reader.wait(2, timeout=0.01) is None
+    reader.close()
@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+pytest.importorskip('uniflex')
+pytest.importorskip('uniflex_module_gnuradio')
+
+from uniflex_module_wifi_gnuradio import (WiFiGnuRadioModule,  # noqa: E402
+                                          WiFiPhyMacStatsEvent)
+from uniflex_module_wifi_gnuradio import template  # noqa: E402
+from uniflex_module_wifi_gnuradio.grc import GrcFlowGraph  # noqa: E402
+
+GR_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          os.pardir, 'gr_scripts')
+PEER_MAC = '30:14:4a:e6:46:e4'
+
+
+def test_construction_loads_no_radio_stack():
+    code = ('import sys, json\n'
+            'from uniflex_module_wifi_gnuradio import WiFiGnuRadioModule\n'
+            'WiFiGnuRadioModule(ctrl_socket_port=8081)\n'
+            'print(json.dumps([m for m in ("sh", "pyric", "zmq", "numpy", '
+            '"gnuradio") if m in sys.modules]))\n')
+    env = dict(os.environ)
+    env.pop('UNIFLEX_PATH', None)
+    out = subprocess.check_output([sys.executable, '-c', code], env=env)
+    assert json.loads(out.decode('utf-8').splitlines()[-1]) == []
+
+
+def test_configuration():
+    module = WiFiGnuRadioModule(ctrl_socket_port=8081, mtu=1000)
+    # the address of the template
+    assert module.usrp_addr == 'addr=192.168.10.2'
+    assert module.notify_address == 'ipc:///tmp/uniflex_wifi_gnuradio_8081'
+    assert module.iq_capture_path == '/dev/shm/uniflex_iq_8081'
+    assert module.get_mtu() == 1000 and module.get_mss() == 960
+    assert module.get_neighbor('192.168.123.2')['mac'] == PEER_MAC
+    with pytest.raises(ValueError):
+        WiFiGnuRadioModule(target_snr=20.0)
+    with pytest.raises(ValueError):
+        WiFiGnuRadioModule(buffer_profile='fast')
+    # the IQ tap is opt-in
+    with pytest.raises(ValueError):
+        WiFiGnuRadioModule(channel_selection={'channels': [172, 176]})
+    with pytest.raises(ValueError):
+        WiFiGnuRadioModule(subnet='192.168.123.1/33')
+
+
+def test_radio_program():
+    template.clear_cache()
+    module = WiFiGnuRadioModule(ctrl_socket_port=8081,
+                                src_mac='12:34:56:78:90:ab',
+                                loopback={'noise_voltage': 0.01},
+                                tap_iface='tap1', iq_capture_size=1024)
+    module.gr_scripts_path = GR_SCRIPTS
+    fg = GrcFlowGraph(module.grc_xml)
+    assert fg.get_param('xmlrpc_server_0', 'port') == '8081'
+    assert fg.get_param('blocks_tuntap_pdu_0', 'ifn') == 'tap1'
+    assert fg.get_param('src_mac', 'value') == '[0x12, 0x34, 0x56, 0x78, 0x90, 0xab]'
+    for block_id in ['uniflex_encap_0', 'uniflex_notifier_0',
+                     'uniflex_iq_tap_0', 'uniflex_zmq_rx_0',
+                     'channels_channel_model_0']:
+        assert fg.has_block(block_id)
+    assert not fg.has_block('uhd_usrp_source_0')
+    assert not fg.has_block('ieee802_11_mac_0')
+    assert "'ipc:///tmp/uniflex_wifi_gnuradio_8081'" == \
+        fg.get_param('uniflex_notifier_0', 'address')
+
+    # same configuration, same (cached) program
+    other = WiFiGnuRadioModule(ctrl_socket_port=8081,
+                               src_mac='12:34:56:78:90:ab',
+                               loopback={'noise_voltage': 0.01},
+                               tap_iface='tap1', iq_capture_size=1024)
+    other.gr_scripts_path = GR_SCRIPTS
+    assert other.grc_xml is module.grc_xml
+
+
+def test_neighbors_without_tap():
+    module = WiFiGnuRadioModule()
+    module.add_neighbors({'192.168.123.3': '30:14:4A:E6:46:E5'})
+    assert module.get_neighbor('192.168.123.3')['mac'] == '30:14:4a:e6:46:e5'
+    module.remove_neighbors(['192.168.123.3'])
+    assert module.get_neighbor('192.168.123.3') is None
+
+    # the DST MAC is the one of the neighbor dst_ipv4_address
+    module.set_dst_mac('30:14:4a:e6:46:e6')
+    assert module.get_dst_mac() == '30:14:4a:e6:46:e6'
+    assert module.get_neighbor('192.168.123.2')['mac'] == '30:14:4a:e6:46:e6'
+    with pytest.raises(ValueError):
+        module.add_neighbors({'192.168.123.4': '30:14:4a:e6:46:e6'})
+
+
+def test_auto_mtu_from_lost_frames():
+    module = WiFiGnuRadioModule(auto_mtu=True, notify_address=None)
+    module.send_event = lambda event: None
+    tuned = []
+    module.tune_mtu = lambda fer, fer_mtu: tuned.append((fer, fer_mtu))
+    nb = {'rx_frames': 60, 'rx_bytes': 60 * 1036, 'rx_lost': 20,
+          'tx_frames': 0, 'tx_bytes': 0, 'snr': 20.0, 'encoding': 0}
+    for _ in range(2):
+        # frames of stations which are not neighbors do not count
+        module._on_notification(WiFiPhyMacStatsEvent(
+            1.0, 120, 0, 0, 0, neighbors={PEER_MAC: nb,
+                                          '00:00:00:00:00:01': nb}))
+    assert tuned == [(0.25, 1000)]
+
+
+def test_calibrated_tx_power(tmp_path):
+    path = tmp_path / 'tx.json'
+    path.write_text(json.dumps({'freqs': [5.8e9, 6.0e9],
+                                'gains': [0.0, 0.5, 1.0],
+                                'dbm': [[-20.0, -5.0, 10.0],
+                                        [-22.0, -7.0, 8.0]]}))
+    module = WiFiGnuRadioModule(tx_calibration=str(path))
+    params = {}
+    module.set_parameters = params.update
+    # radio not running
+    module.get_parameters = lambda names: None
+    module.set_tx_power(0.0, 'tap0')
+    assert not params and module.tx_power_dBm is None
+    assert module.get_tx_power('tap0') is None
+
+    state = {'freq': 5.8e9, 'tx_gain': 0.5, 'rx_gain': 0.25}
+    module.get_parameters = lambda names: {n: state[n] for n in names}
+    # clamped to the calibration, the applied power is kept
+    module.set_tx_power(20.0, 'tap0')
+    assert params['tx_gain'] == 1.0 and module.tx_power_dBm == 10.0
+    assert module.get_tx_power('tap0') == -5.0
+    # uncalibrated: normalized gain, same type
+    assert module.get_rx_gain('tap0') == 0.25
+
+
+def test_capture_range():
+    with pytest.raises(ValueError):
+        WiFiGnuRadioModule().capture_iq(1024)
+    module = WiFiGnuRadioModule(iq_capture_size=1024)
+    # the analysis needs a complete window
+    with pytest.raises(ValueError):
+        module.capture_iq(79)
+    with pytest.raises(ValueError):
+        module.capture_iq(1025, analyze=False)
+
+
+def test_concurrent_captures(tmp_path):
+    import threading
+    import numpy as np
+    from uniflex_module_wifi_gnuradio.iq import HEADER_BYTES
+
+    path = str(tmp_path / 'iq')
+    size = 1024
+    buf = np.memmap(path, dtype=np.uint8, mode='w+',
+                    shape=(HEADER_BYTES + 8 * size,))
+    header = buf[:HEADER_BYTES].view(np.int64)
+    data = buf[HEADER_BYTES:].view(np.complex64)
+
+    def tap(params):
+        # the IQ tap, completing the capture shortly after it is armed
+        n = params['iq_capture']
+        header[0] += 1
+        data[:n] = header[0]
+        threading.Timer(0.001, lambda: header.__setitem__(1, n) or
+                        header.__setitem__(2, header[0])).start()
+
+    # instances attached to the same transceiver
+    modules = [WiFiGnuRadioModule(iq_capture_size=size, iq_capture_path=path)
+               for _ in range(4)]
+    failed = []
+    for module in modules:
+        module.set_parameters = tap
+
+    def capture(module):
+        for n in range(1, 21):
+            samples, _ = module.capture_iq(n, timeout=1.0, analyze=False)
+            if samples is None or len(samples) != n:
+                failed.append(n)
+
+    threads = [threading.Thread(target=capture, args=(m,)) for m in modules]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not failed
+    assert header[0] == 4 * 20
+
+
+def test_radio_program_follows_block_sources(tmp_path):
+    import shutil
+    template.clear_cache()
+    gr_scripts = str(tmp_path / 'gr_scripts')
+    shutil.copytree(GR_SCRIPTS, gr_scripts)
+    module = WiFiGnuRadioModule(ctrl_socket_port=8082)
+    module.gr_scripts_path = gr_scripts
+    xml = module.grc_xml
+
+    path = os.path.join(gr_scripts, 'uniflex_encap.py')
+    with open(path, 'a') as f:
+        f.write('\n# modified\n')
+    os.utime(path, (0, os.path.getmtime(path) + 1))
+    module.gr_scripts_path = gr_scripts
+    assert module.grc_xml != xml
+    assert '# modified' in GrcFlowGraph(module.grc_xml).get_param(
+        'uniflex_encap_0', '_source_code')
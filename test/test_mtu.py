@@ -0,0 +1,31 @@
+from uniflex_module_wifi_gnuradio import mtu
+
+
+def test_max_mtu_fills_max_psdu():
+    assert mtu.psdu_length(mtu.MAX_MTU) == mtu.MAX_PSDU == 1528
+    assert mtu.MAX_MTU == 1492
+
+
+def test_airtime_grows_with_mtu_and_shrinks_with_encoding():
+    assert mtu.frame_airtime(1000, 0) > mtu.frame_airtime(500, 0)
+    assert mtu.frame_airtime(1000, 7) < mtu.frame_airtime(1000, 0)
+    # 802.11a at 20 MHz without padding: 20 us + 4 us per symbol
+    n_sym = (16 + 8 * mtu.psdu_length(100) + 6 + 23) // 24
+    assert abs(mtu.frame_airtime(100, 0, 20e6, 0) - (20e-6 + 4e-6 * n_sym)) < 1e-12
+
+
+def test_ber_from_fer():
+    assert mtu.ber_from_fer(0.0, 1000) == 0.0
+    assert mtu.ber_from_fer(1.0, 1000) == 1.0
+    ber = mtu.ber_from_fer(0.1, 1000)
+    assert abs((1 - ber) ** (8 * mtu.psdu_length(1000)) - 0.9) < 1e-9
+
+
+def test_best_mtu():
+    # error free: the largest frames amortize the per-frame overhead (up
+    # to the padding of the last OFDM symbol)
+    assert mtu.best_mtu(0) > mtu.MAX_MTU - mtu.DATA_BITS_PER_SYMBOL[0] // 8
+    # lossy link: shorter frames
+    lossy = mtu.best_mtu(0, fer=0.5, fer_mtu=1000)
+    assert mtu.MIN_MTU <= lossy < mtu.MAX_MTU
+    assert mtu.best_mtu(0, candidates=range(100, 501)) == 500
@@ -0,0 +1,64 @@
+import pytest
+from uniflex_module_wifi_gnuradio.neighbors import (NeighborTable, neigh_batch,
+                                                    normalize_mac)
+
+
+def test_add_lookup_remove():
+    table = NeighborTable()
+    nb = table.add('192.168.123.2', '30:14:4A:E6:46:E4')
+    assert nb.mac == '30:14:4a:e6:46:e4'
+    assert '192.168.123.2' in table and len(table) == 1
+    assert table.get_by_mac('30:14:4a:e6:46:e4') is nb
+    # unchanged entries are not reported again
+    assert table.add('192.168.123.2', '30:14:4a:e6:46:e4') is None
+
+    assert table.add('192.168.123.2', '30:14:4a:e6:46:e5') is nb
+    assert table.get_by_mac('30:14:4a:e6:46:e4') is None
+    assert table.get_by_mac('30:14:4a:e6:46:e5') is nb
+
+    assert table.remove('192.168.123.2') is nb
+    assert table.remove('192.168.123.2') is None
+    assert len(table) == 0 and table.get_by_mac(nb.mac) is None
+
+
+def test_one_address_per_mac():
+    table = NeighborTable()
+    nb = table.add('192.168.123.2', '30:14:4a:e6:46:e4')
+    with pytest.raises(ValueError):
+        table.add('192.168.123.3', '30:14:4a:e6:46:e4')
+    other = table.add('192.168.123.3', '30:14:4a:e6:46:e5')
+    with pytest.raises(ValueError):
+        table.add('192.168.123.3', '30:14:4a:e6:46:e4')
+    assert '192.168.123.3' in table and other.mac == '30:14:4a:e6:46:e5'
+    assert table.get_by_mac(nb.mac) is nb
+
+
+def test_update_stats():
+    table = NeighborTable()
+    nb = table.add('192.168.123.2', '30:14:4a:e6:46:e4')
+    stats = {'rx_frames': 3, 'rx_bytes': 300, 'rx_lost': 1, 'tx_frames': 2,
+             'tx_bytes': 200, 'snr': 21.5, 'encoding': 2}
+    unknown = dict(stats)
+    table.update_stats({nb.mac: stats, '00:00:00:00:00:01': unknown}, 10.0)
+    table.update_stats({nb.mac: dict(stats, rx_frames=0, snr=None)}, 11.0)
+    assert (nb.rx_frames, nb.rx_bytes, nb.rx_lost) == (3, 600, 2)
+    assert (nb.tx_frames, nb.tx_bytes) == (4, 400)
+    # last_seen only moves with received frames, snr keeps the last value
+    assert nb.last_seen == 10.0
+    assert nb.snr == 21.5 and nb.encoding == 2
+    assert len(table) == 1
+
+
+def test_neigh_batch():
+    table = NeighborTable()
+    table.add('192.168.123.2', '30:14:4a:e6:46:e4')
+    table.add('192.168.123.3', '30:14:4a:e6:46:e5')
+    assert neigh_batch(table, 'tap0') == (
+        'neigh replace 192.168.123.2 lladdr 30:14:4a:e6:46:e4 dev tap0 nud permanent\n'
+        'neigh replace 192.168.123.3 lladdr 30:14:4a:e6:46:e5 dev tap0 nud permanent\n')
+    assert neigh_batch(table, 'tap0', delete=True) == (
+        'neigh del 192.168.123.2 dev tap0\nneigh del 192.168.123.3 dev tap0\n')
+
+
+def test_normalize_mac():
+    assert normalize_mac('0:A:b:c:d:e') == '00:0a:0b:0c:0d:0e'
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip('uniflex')
+
+from uniflex_module_wifi_gnuradio.notifications import (  # noqa: E402
+    WiFiParameterChangedEvent, WiFiPhyMacStatsEvent, message_to_event)
+
+
+def test_param_message():
+    event = message_to_event({'type': 'param', 'params': {'freq': 5.89e9},
+                              'time': 1.0})
+    assert isinstance(event, WiFiParameterChangedEvent)
+    assert event.params == {'freq': 5.89e9}
+    assert event.timestamp == 1.0
+
+
+def test_stats_message():
+    neighbors = {'30:14:4a:e6:46:e4': {'rx_frames': 1, 'rx_bytes': 100,
+                                       'rx_lost': 0, 'tx_frames': 0,
+                                       'tx_bytes': 0, 'snr': 20.0,
+                                       'encoding': 0}}
+    event = message_to_event({'type': 'stats', 'interval': 1.0,
+                              'rx_frames': 1, 'rx_bytes': 100,
+                              'tx_frames': 2, 'tx_bytes': 200, 'snr': 20.0,
+                              'time': 2.0, 'neighbors': neighbors})
+    assert isinstance(event, WiFiPhyMacStatsEvent)
+    assert (event.interval, event.rx_frames, event.rx_bytes,
+            event.tx_frames, event.tx_bytes) == (1.0, 1, 100, 2, 200)
+    assert event.snr == 20.0 and event.timestamp == 2.0
+    assert event.neighbors == neighbors
+
+    event = message_to_event({'type': 'stats', 'interval': 1.0,
+                              'rx_frames': 0, 'rx_bytes': 0,
+                              'tx_frames': 0, 'tx_bytes': 0})
+    assert event.snr is None and event.neighbors == {}
+
+
+def test_unknown_message():
+    assert message_to_event({'type': 'debug'}) is None
+    assert message_to_event({}) is None
@@ -1 +1,33 @@
-from .wifi_gnuradio import *
\ No newline at end of file
+import importlib
+
+# classes are imported on first access, importing the package (or one of
+# the helpers, e.g. .mtu or .template) does not load the radio stack
+_EXPORTS = {
+    'WiFiGnuRadioModule': '.wifi_gnuradio',
+    'WiFiParameterChangedEvent': '.notifications',
+    'WiFiPhyMacStatsEvent': '.notifications',
+    'NotificationSubscriber': '.notifications',
+    'message_to_event': '.notifications',
+    'LoopbackChannel': '.loopback',
+    'NeighborTable': '.neighbors',
+    'GainCalibration': '.calibration',
+    'TxPowerController': '.calibration',
+    'IqSnapshotBuffer': '.iq',
+    'ChannelSelector': '.channel_selection',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}"
+                             .format(__name__, name))
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
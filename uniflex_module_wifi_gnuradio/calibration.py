@@ -0,0 +1,127 @@
+import csv
+import json
+import numpy as np
+
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+
+def _locate(grid, x):
+    # index of the left grid point and interpolation weight, clamped
+    idx = np.clip(np.searchsorted(grid, x, side='right') - 1, 0, len(grid) - 2)
+    w = np.clip((x - grid[idx]) / (grid[idx + 1] - grid[idx]), 0.0, 1.0)
+    return idx, w
+
+
+class GainCalibration(object):
+    """
+        Calibration table of one USRP direction (TX power or RX gain):
+        dbm[i, j] is the value in dBm (dB) at frequency freqs[i] and
+        normalized gain gains[j]. Conversions are bilinear interpolations
+        and accept scalars or arrays (broadcast).
+    """
+
+    def __init__(self, freqs, gains, dbm):
+        self.freqs = np.asarray(freqs, dtype=float)
+        self.gains = np.asarray(gains, dtype=float)
+        self.dbm = np.asarray(dbm, dtype=float)
+        if self.dbm.shape != (len(self.freqs), len(self.gains)):
+            raise ValueError("Calibration table has shape {}, expected {}"
+                             .format(self.dbm.shape,
+                                     (len(self.freqs), len(self.gains))))
+        if len(self.freqs) < 2 or len(self.gains) < 2:
+            raise ValueError("Calibration needs at least 2x2 points")
+        if np.any(np.diff(self.dbm, axis=1) <= 0):
+            raise ValueError("Calibration must increase with the gain")
+
+    @classmethod
+    def load(cls, path):
+        """
+            Load a calibration file:
+            - JSON: {"freqs": [...], "gains": [...], "dbm": [[...], ...]}
+            - CSV: rows freq,gain,dbm (header optional) on a full grid
+        """
+        if path.endswith('.json'):
+            with open(path) as f:
+                data = json.load(f)
+            return cls(data['freqs'], data['gains'], data['dbm'])
+
+        with open(path) as f:
+            rows = [r for r in csv.reader(f) if r and not r[0].startswith('#')]
+        try:
+            float(rows[0][0])
+        except (IndexError, ValueError):
+            # header
+            rows = rows[1:]
+        points = np.array(rows, dtype=float)
+        freqs, fi = np.unique(points[:, 0], return_inverse=True)
+        gains, gi = np.unique(points[:, 1], return_inverse=True)
+        dbm = np.full((len(freqs), len(gains)), np.nan)
+        dbm[fi, gi] = points[:, 2]
+        if np.isnan(dbm).any():
+            raise ValueError("Calibration file {} is not a full freq x gain grid"
+                             .format(path))
+        return cls(freqs, gains, dbm)
+
+    def _row(self, freq):
+        # table interpolated to freq, shape freq.shape + (len(gains),)
+        i, w = _locate(self.freqs, freq)
+        w = w[..., np.newaxis]
+        return self.dbm[i] * (1.0 - w) + self.dbm[i + 1] * w
+
+    def to_dbm(self, freq, gain):
+        freq, gain = np.broadcast_arrays(np.asarray(freq, dtype=float),
+                                         np.asarray(gain, dtype=float))
+        row = self._row(freq)
+        j, w = _locate(self.gains, gain)
+        lo = np.take_along_axis(row, j[..., np.newaxis], -1)[..., 0]
+        hi = np.take_along_axis(row, j[..., np.newaxis] + 1, -1)[..., 0]
+        return lo * (1.0 - w) + hi * w
+
+    def to_gain(self, freq, dbm):
+        freq, dbm = np.broadcast_arrays(np.asarray(freq, dtype=float),
+                                        np.asarray(dbm, dtype=float))
+        row = self._row(freq)
+        # rows increase with the gain: count the points below dbm
+        j = np.clip(np.sum(row <= dbm[..., np.newaxis], axis=-1) - 1,
+                    0, len(self.gains) - 2)
+        lo = np.take_along_axis(row, j[..., np.newaxis], -1)[..., 0]
+        hi = np.take_along_axis(row, j[..., np.newaxis] + 1, -1)[..., 0]
+        w = np.clip((dbm - lo) / (hi - lo), 0.0, 1.0)
+        return self.gains[j] + w * (self.gains[j + 1] - self.gains[j])
+
+    def dbm_range(self, freq):
+        row = self._row(np.asarray(freq, dtype=float))
+        return row[..., 0], row[..., -1]
+
+
+class TxPowerController(object):
+    """
+        Closed-loop TX power control: use the lowest power which keeps
+        the SNR reported for the link at target_snr + margin.
+
+        The SNR is the one the peer measures on our frames, fed back over
+        the controller (see WiFiGnuRadioModule.report_peer_stats), so
+        the loop is closed over the link it controls. Decreases are done
+        in steps of step_db, increases jump by the missing SNR.
+    """
+
+    def __init__(self, target_snr, margin=2.0, step_db=1.0,
+                 min_dbm=-30.0, max_dbm=20.0):
+        self.target_snr = target_snr
+        self.margin = margin
+        self.step_db = step_db
+        self.min_dbm = min_dbm
+        self.max_dbm = max_dbm
+
+    def update(self, power_dbm, snr):
+        """Return the TX power for the next interval."""
+        if snr is None:
+            return power_dbm
+        if snr < self.target_snr:
+            power_dbm += self.target_snr + self.margin - snr
+        elif snr > self.target_snr + 2 * self.margin:
+            power_dbm -= self.step_db
+        return float(np.clip(power_dbm, self.min_dbm, self.max_dbm))
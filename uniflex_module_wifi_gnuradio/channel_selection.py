@@ -0,0 +1,315 @@
+import time
+import logging
+import threading
+from . import mtu as mtu_model
+from . import template as grc_template
+
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+# retuning the USRP
+TUNE_TIME = 0.005
+
+
+class OccupancyScores(object):
+    """
+        Exponentially weighted occupancy (fraction of busy time, 0..1)
+        per channel; channels without measurement have no score.
+    """
+
+    def __init__(self, channels, alpha=0.3):
+        self.channels = list(channels)
+        self.alpha = alpha
+        self.scores = dict.fromkeys(self.channels)
+
+    def update(self, channel, occupancy):
+        old = self.scores.get(channel)
+        if old is None:
+            self.scores[channel] = occupancy
+        else:
+            self.scores[channel] = old + self.alpha * (occupancy - old)
+        return self.scores[channel]
+
+    def get(self, channel):
+        return self.scores.get(channel)
+
+    def best(self):
+        scored = [ch for ch in self.channels if self.scores[ch] is not None]
+        if not scored:
+            return None
+        return min(scored, key=lambda ch: self.scores[ch])
+
+
+class ChannelSelector(threading.Thread):
+    """
+        Interference-aware channel selection, run on the agent next to
+        the module.
+
+        Every interval all candidate channels are evaluated:
+        - the operating channel from the decode statistics (airtime of
+          frames from stations which are not neighbors, see on_stats) and
+          a short IQ snapshot (duty cycle minus the airtime of the own
+          link),
+        - every other channel by a dwell of dwell seconds on it (IQ
+          snapshot, duty cycle) after settle_time (default: until the
+          samples buffered ahead of the IQ tap were taken on the channel);
+          the link is interrupted for both.
+        The duty cycle is the fraction of windows threshold_db above an
+        absolute noise floor: noise_floor_db (e.g. from a calibration)
+        or the lowest floor estimated over the snapshots of this and the
+        previous round, so a channel busy all the time is not taken for
+        idle as long as one candidate is quiet part of the time.
+        The occupancy is smoothed per channel (OccupancyScores). The node
+        and its peers (modules with set_channel, e.g. proxies of the peer
+        nodes) migrate if another channel is better by more than
+        hysteresis.
+
+        Every migration is reported with the link goodput (from the
+        decode statistics) before and after it, see report.
+    """
+
+    def __init__(self, module, channels, peers=(), interval=10.0, dwell=0.02,
+                 settle_time=None, alpha=0.3, hysteresis=0.15,
+                 noise_floor_db=None, threshold_db=6.0):
+        super(ChannelSelector, self).__init__()
+        self.daemon = True
+        self.log = logging.getLogger('WiFiGnuRadioModule.channel_selection')
+        self.module = module
+        self.peers = list(peers)
+        self.interval = interval
+        self.dwell = dwell
+        self.settle_time = settle_time
+        self.hysteresis = hysteresis
+        self.threshold_db = threshold_db
+        self._noise_floor_db = noise_floor_db
+        # lowest snapshot floor of the last round
+        self._floor_estimate = None
+        self.scores = OccupancyScores(channels, alpha)
+        self.report = []
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._running = True
+        self._samp_rate = mtu_model.SAMP_RATE
+        self._reset_stats()
+        self._reset_goodput()
+
+    def _reset_stats(self):
+        # occupancy of the operating channel, consumed by measure
+        self._stats_time = 0.0
+        self._foreign_airtime = 0.0
+        self._own_airtime = 0.0
+
+    def _reset_goodput(self):
+        # link goodput on the operating channel, reset by migrate
+        self._goodput_time = 0.0
+        self._goodput_bytes = 0
+
+    def run(self):
+        while self._running:
+            self._event.wait(self.interval)
+            if not self._running:
+                break
+            try:
+                self.evaluate()
+            except Exception as e:
+                self.log.warning("Channel evaluation failed: {}".format(e))
+
+    def stop(self):
+        self._running = False
+        self._event.set()
+
+    def on_stats(self, event):
+        """Account a WiFiPhyMacStatsEvent of the operating channel."""
+        samp_rate = self._samp_rate
+        with self._lock:
+            self._stats_time += event.interval
+            self._goodput_time += event.interval
+            for mac, nb in event.neighbors.items():
+                own = self.module.neighbor_table.get_by_mac(mac) is not None
+                airtime = self._airtime(nb, samp_rate)
+                if own:
+                    self._own_airtime += airtime
+                    self._goodput_bytes += self._msdu_bytes(nb)
+                else:
+                    self._foreign_airtime += airtime
+
+    @staticmethod
+    def _airtime(nb, samp_rate):
+        # foo.packet_pad2 padding is only added by our own transmitter
+        airtime = 0.0
+        for frames, nbytes, pad in ((nb['rx_frames'], nb['rx_bytes'], 0),
+                                    (nb['tx_frames'], nb['tx_bytes'],
+                                     mtu_model.PAD_SAMPLES)):
+            if not frames:
+                continue
+            mtu = max(0, nbytes // frames - mtu_model.psdu_length(0))
+            encoding = nb.get('encoding') or 0
+            airtime += frames * mtu_model.frame_airtime(
+                mtu, encoding, samp_rate, pad)
+        return airtime
+
+    @staticmethod
+    def _msdu_bytes(nb):
+        frames = nb['rx_frames'] + nb['tx_frames']
+        return max(0, nb['rx_bytes'] + nb['tx_bytes'] -
+                   frames * mtu_model.psdu_length(0))
+
+    def _take_stats(self):
+        with self._lock:
+            stats = (self._stats_time, self._foreign_airtime,
+                     self._own_airtime)
+            self._reset_stats()
+        return stats
+
+    def goodput(self):
+        """Link goodput in bit/s since the last migration."""
+        with self._lock:
+            if not self._goodput_time:
+                return None
+            return 8.0 * self._goodput_bytes / self._goodput_time
+
+    @property
+    def noise_floor_db(self):
+        """Noise floor in use (dB), None before the first round."""
+        if self._noise_floor_db is not None:
+            return self._noise_floor_db
+        return self._floor_estimate
+
+    def _window_power_db(self):
+        n_samples = int(self.dwell * self._samp_rate)
+        from .iq import WINDOW, window_power_db
+        n_samples = min(max(n_samples, WINDOW), self.module.iq_capture_size)
+        samples, _ = self.module.capture_iq(n_samples, analyze=False)
+        if samples is None:
+            return None
+        return window_power_db(samples)
+
+    def _settle_time(self):
+        if self.settle_time is not None:
+            return self.settle_time
+        # after retuning, the output buffers ahead of the IQ tap (USRP
+        # source or loopback receiver, channel model, interferer) still
+        # hold samples of the previous channel, the loopback receiver
+        # holds back new bursts for its jitter buffer
+        maxoutbuf = grc_template.BUFFER_PROFILES[
+            self.module.buffer_profile]['maxoutbuf']
+        n_blocks, latency = 1, 0.0
+        loopback = self.module.loopback
+        if loopback is not None:
+            n_blocks = 3 if loopback.interferers else 2
+            latency = loopback.latency
+        buffered = n_blocks * (maxoutbuf or grc_template.DEFAULT_BUFFER_ITEMS)
+        return buffered / self._samp_rate + latency + TUNE_TIME
+
+    def measure(self, channel, current):
+        """Window power (dB) of a snapshot of channel (None if not taken)."""
+        if channel == current:
+            return self._window_power_db()
+
+        iface = self.module.tap_iface
+        self.module.set_channel(channel, iface)
+        try:
+            time.sleep(self._settle_time())
+            return self._window_power_db()
+        finally:
+            self.module.set_channel(current, iface)
+
+    def estimate_noise_floor(self, powers):
+        """Absolute noise floor (dB) for the snapshots of one round."""
+        if self._noise_floor_db is not None:
+            return self._noise_floor_db
+        from .iq import noise_floor
+        floors = [noise_floor(p) for p in powers if p is not None and len(p)]
+        previous = self._floor_estimate
+        if floors:
+            self._floor_estimate = min(floors)
+        candidates = floors + ([previous] if previous is not None else [])
+        return min(candidates) if candidates else None
+
+    def occupancy(self, power_db, noise_floor_db, stats=None):
+        """
+            Occupancy in [0, 1] (None if not measurable) from the window
+            power of a snapshot and, for the operating channel, the decode
+            statistics (duration, foreign airtime, own airtime).
+        """
+        duty_cycle = None
+        if power_db is not None and len(power_db) and noise_floor_db is not None:
+            from .iq import duty_cycle as busy_fraction
+            duty_cycle = busy_fraction(power_db, noise_floor_db,
+                                       self.threshold_db)
+        if stats is None:
+            return duty_cycle
+
+        duration, foreign, own = stats
+        occupancy = foreign / duration if duration else None
+        if duty_cycle is not None:
+            own = own / duration if duration else 0.0
+            occupancy = max(occupancy or 0.0, duty_cycle - own)
+        return None if occupancy is None else min(occupancy, 1.0)
+
+    def evaluate(self):
+        """One evaluation round, returns the (new) operating channel."""
+        current = self.module.get_channel(self.module.tap_iface)
+        if current is None:
+            return None
+        samp_rate = self.module.get_parameters(['samp_rate'])
+        if samp_rate:
+            self._samp_rate = float(samp_rate['samp_rate'])
+        self._finish_report()
+
+        stats = self._take_stats()
+        powers = {channel: self.measure(channel, current)
+                  for channel in self.scores.channels}
+        floor = self.estimate_noise_floor(powers.values())
+        for channel, power_db in powers.items():
+            occupancy = self.occupancy(power_db, floor,
+                                       stats if channel == current else None)
+            if occupancy is not None:
+                self.scores.update(channel, occupancy)
+
+        best = self.scores.best()
+        score = self.scores.get(current)
+        self.log.debug("Channel scores: {}".format(self.scores.scores))
+        if (best is None or best == current or score is None or
+                score - self.scores.get(best) <= self.hysteresis):
+            return current
+
+        self.migrate(best, current)
+        return best
+
+    def migrate(self, channel, current=None):
+        goodput = self.goodput()
+        with self._lock:
+            self._reset_stats()
+            self._reset_goodput()
+        self.log.info("Migrating from channel {} to {}".format(current, channel))
+        # peers first, they lose the link to us
+        for peer in self.peers + [self.module]:
+            peer.set_channel(channel, self.module.tap_iface)
+        self.report.append({
+            'time': time.time(),
+            'from': current,
+            'to': channel,
+            'score_from': self.scores.get(current),
+            'score_to': self.scores.get(channel),
+            'goodput_before_bps': goodput,
+            'goodput_after_bps': None,
+            'gain': None,
+        })
+
+    def _finish_report(self):
+        # goodput on the channel of the last migration
+        if not self.report or self.report[-1]['goodput_after_bps'] is not None:
+            return
+        goodput = self.goodput()
+        if goodput is None:
+            return
+        entry = self.report[-1]
+        entry['goodput_after_bps'] = goodput
+        before = entry['goodput_before_bps']
+        if before:
+            entry['gain'] = goodput / before - 1.0
+        self.log.info("Goodput after migration to channel {}: {:.0f} bit/s "
+                      "(before {})".format(entry['to'], goodput, before))
@@ -0,0 +1,130 @@
+import time
+import logging
+import itertools
+from collections import OrderedDict
+import numpy as np
+from . import traffic
+
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+
+class ParameterSweep(object):
+    """
+        Measures goodput, loss and latency through the tap device for
+        every point of a parameter grid, e.g.
+            {'channel': [172, 176], 'tx_power': [0.5, 0.75],
+             'encoding': [0, 2, 4]}
+        The radio program keeps running, only the parameters which change
+        between two points are set (last grid dimension changes fastest).
+
+        Early stopping: a point whose ping probe gets no answer is dead and
+        not measured further. If harder lists parameters with the direction
+        in which the link gets worse (e.g. {'encoding': +1,
+        'tx_power': -1}), all later points at least as hard as a dead one
+        (other parameters equal) are skipped.
+
+        The peer has to run traffic.serve(port).
+    """
+
+    SETTERS = {
+        'channel': 'set_channel',
+        'tx_power': 'set_tx_power',
+        'rx_gain': 'set_rx_gain',
+        'bandwidth': 'set_bandwidth',
+        'encoding': 'set_encoding',
+    }
+
+    def __init__(self, module, grid, peer, harder=None, mtu=None,
+                 duration=5.0, rate_pps=500.0, pings=20, probe_pings=3,
+                 settle_time=0.5, port=traffic.PORT):
+        for name in grid:
+            if name not in self.SETTERS:
+                raise ValueError("Unknown sweep parameter {}".format(name))
+        self.log = logging.getLogger('WiFiGnuRadioModule.experiment')
+        self.module = module
+        self.grid = OrderedDict(grid)
+        self.peer = peer
+        self.harder = harder if harder is not None else {}
+        self.mtu = mtu
+        self.duration = duration
+        self.rate_pps = rate_pps
+        self.pings = pings
+        self.probe_pings = probe_pings
+        self.settle_time = settle_time
+        self.port = port
+
+    def points(self):
+        names = list(self.grid)
+        for values in itertools.product(*self.grid.values()):
+            yield OrderedDict(zip(names, values))
+
+    def _dominated(self, point, dead):
+        for name, value in point.items():
+            direction = self.harder.get(name)
+            if direction is None:
+                if value != dead[name]:
+                    return False
+            elif direction * (value - dead[name]) < 0:
+                return False
+        return True
+
+    def _apply(self, point, current):
+        for name, value in point.items():
+            if current.get(name) == value:
+                continue
+            getattr(self.module, self.SETTERS[name])(value, self.module.tap_iface)
+            current[name] = value
+
+    def run(self):
+        """Run the sweep, returns the results as columns (numpy arrays)."""
+        mtu = self.mtu if self.mtu is not None else self.module.get_mtu()
+        probe = traffic.UdpProbe(self.peer, self.port)
+        rows = []
+        dead = []
+        current = {}
+        try:
+            for point in self.points():
+                row = OrderedDict(point)
+                row.update(goodput_bps=np.nan, delivery_ratio=np.nan,
+                           rtt_p50_ms=np.nan, rtt_p99_ms=np.nan,
+                           skipped=False)
+                rows.append(row)
+
+                if any(self._dominated(point, d) for d in dead):
+                    row['skipped'] = True
+                    row['goodput_bps'] = 0.0
+                    row['delivery_ratio'] = 0.0
+                    continue
+
+                self._apply(point, current)
+                time.sleep(self.settle_time)
+
+                if not probe.latency(self.probe_pings):
+                    self.log.info('Dead configuration {}'.format(dict(point)))
+                    dead.append(point)
+                    row['goodput_bps'] = 0.0
+                    row['delivery_ratio'] = 0.0
+                    continue
+
+                goodput, ratio = probe.throughput(mtu, self.duration,
+                                                  self.rate_pps)
+                rtts = probe.latency(self.pings)
+                if goodput is not None:
+                    row['goodput_bps'] = goodput
+                    row['delivery_ratio'] = ratio
+                if rtts:
+                    row['rtt_p50_ms'] = 1e3 * traffic.percentile(rtts, 0.5)
+                    row['rtt_p99_ms'] = 1e3 * traffic.percentile(rtts, 0.99)
+                self.log.info('{}: {}'.format(dict(point), dict(row)))
+        finally:
+            probe.close()
+
+        return OrderedDict((name, np.array([row[name] for row in rows]))
+                           for name in rows[0]) if rows else OrderedDict()
+
+    @staticmethod
+    def save(results, path):
+        np.savez(path, **results)
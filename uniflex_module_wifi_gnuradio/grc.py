@@ -0,0 +1,143 @@
+import copy
+import xml.etree.ElementTree as ET
+
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+
+class GrcFlowGraph(object):
+    """
+        Minimal editor for GRC flow graph files (format 1, GNU Radio 3.7).
+        Used to adapt the transceiver radio program on the agent side
+        before it is handed to activate_radio_program.
+    """
+
+    def __init__(self, grc_xml):
+        # keep the <?xml ..?> and <?grc ..?> header, ElementTree drops it
+        idx = grc_xml.find('<flow_graph')
+        self.header = grc_xml[:idx]
+        self.root = ET.fromstring(grc_xml[idx:])
+
+    def copy(self):
+        fg = GrcFlowGraph.__new__(GrcFlowGraph)
+        fg.header = self.header
+        fg.root = copy.deepcopy(self.root)
+        return fg
+
+    def to_xml(self):
+        return self.header + ET.tostring(self.root, encoding='unicode') + '\n'
+
+    def blocks(self, key=None):
+        for block in self.root.findall('block'):
+            if key is None or block.findtext('key') == key:
+                yield block
+
+    def block_ids(self, key=None):
+        return [self._param(block, 'id').findtext('value')
+                for block in self.blocks(key)]
+
+    def has_block(self, block_id):
+        return self._find_block(block_id) is not None
+
+    def get_param(self, block_id, key):
+        param = self._param(self._get_block(block_id), key)
+        if param is None:
+            return None
+        return param.findtext('value')
+
+    def set_param(self, block_id, key, value):
+        block = self._get_block(block_id)
+        param = self._param(block, key)
+        if param is None:
+            param = ET.SubElement(block, 'param')
+            ET.SubElement(param, 'key').text = key
+            ET.SubElement(param, 'value')
+        param.find('value').text = str(value)
+
+    def set_param_all(self, key, value):
+        # every block having the param, e.g. maxoutbuf
+        for block in self.blocks():
+            param = self._param(block, key)
+            if param is not None:
+                param.find('value').text = str(value)
+
+    def set_variable(self, var_id, value):
+        self.set_param(var_id, 'value', value)
+
+    def add_block(self, key, block_id, coordinate=(0, 0), **params):
+        if self.has_block(block_id):
+            raise ValueError("Block {} already exists".format(block_id))
+        block = ET.Element('block')
+        ET.SubElement(block, 'key').text = key
+        # new blocks go after the existing ones, before the connections
+        self.root.insert(self._first_connection_idx(), block)
+        param = ET.SubElement(block, 'param')
+        ET.SubElement(param, 'key').text = 'id'
+        ET.SubElement(param, 'value').text = block_id
+        self.set_param(block_id, '_enabled', True)
+        self.set_param(block_id, '_coordinate', str(tuple(coordinate)))
+        self.set_param(block_id, '_rotation', 0)
+        for k, v in params.items():
+            self.set_param(block_id, k, v)
+        return block
+
+    def remove_block(self, block_id):
+        self.root.remove(self._get_block(block_id))
+        for conn in list(self.connections(block_id)):
+            self.root.remove(conn)
+
+    def connections(self, block_id=None):
+        for conn in self.root.findall('connection'):
+            if (block_id is None or
+                    block_id in (conn.findtext('source_block_id'),
+                                 conn.findtext('sink_block_id'))):
+                yield conn
+
+    def connect(self, src_id, src_key, sink_id, sink_key):
+        conn = ET.SubElement(self.root, 'connection')
+        ET.SubElement(conn, 'source_block_id').text = src_id
+        ET.SubElement(conn, 'sink_block_id').text = sink_id
+        ET.SubElement(conn, 'source_key').text = str(src_key)
+        ET.SubElement(conn, 'sink_key').text = str(sink_key)
+
+    def disconnect(self, src_id, src_key, sink_id, sink_key):
+        for conn in list(self.connections()):
+            if (conn.findtext('source_block_id') == src_id and
+                    conn.findtext('sink_block_id') == sink_id and
+                    conn.findtext('source_key') == str(src_key) and
+                    conn.findtext('sink_key') == str(sink_key)):
+                self.root.remove(conn)
+
+    def _first_connection_idx(self):
+        for idx, child in enumerate(self.root):
+            if child.tag == 'connection':
+                return idx
+        return len(self.root)
+
+    def _param(self, block, key):
+        for param in block.findall('param'):
+            if param.findtext('key') == key:
+                return param
+        return None
+
+    def _find_block(self, block_id):
+        found = None
+        for block in self.blocks():
+            param = self._param(block, 'id')
+            if param is not None and param.findtext('value') == block_id:
+                # disabled GUI widgets share the id of the variable they
+                # replace, prefer the enabled block
+                enabled = self._param(block, '_enabled')
+                if enabled is None or enabled.findtext('value') != '0':
+                    return block
+                found = block
+        return found
+
+    def _get_block(self, block_id):
+        block = self._find_block(block_id)
+        if block is None:
+            raise KeyError("No such block: {}".format(block_id))
+        return block
+
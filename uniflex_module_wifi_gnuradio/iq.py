@@ -0,0 +1,182 @@
+import os
+import time
+import numpy as np
+
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+# see gr_scripts/uniflex_iq_tap.py
+HEADER_BYTES = 64
+
+# FFT size and power window (one OFDM symbol at 20 MHz) of analyze
+NFFT = 64
+WINDOW = 80
+
+
+class IqSnapshotBuffer(object):
+    """
+        Agent side of the memory-mapped IQ snapshot buffer written by the
+        IQ tap of the transceiver. Snapshots are returned as read-only
+        views on the mapping, i.e. without copying.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._header = None
+        self._data = None
+
+    def _open(self):
+        if self._header is None:
+            buf = np.memmap(self.path, dtype=np.uint8, mode='r')
+            self._header = buf[:HEADER_BYTES].view(np.int64)
+            self._data = buf[HEADER_BYTES:].view(np.complex64)
+
+    @property
+    def size(self):
+        self._open()
+        return len(self._data)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def seq(self):
+        self._open()
+        return int(self._header[0])
+
+    def wait(self, seq, timeout=5.0, poll_interval=0.001):
+        """Wait for capture seq to complete, return the samples or None."""
+        self._open()
+        deadline = time.time() + timeout
+        while int(self._header[2]) != seq:
+            if time.time() > deadline:
+                return None
+            time.sleep(poll_interval)
+        return self._data[:int(self._header[1])]
+
+    def close(self):
+        self._header = None
+        self._data = None
+
+
+def power_spectrum(iq, samp_rate, nfft=NFFT):
+    """Averaged periodogram (Welch, Hann window), returns (freqs, psd_db)."""
+    n_seg = len(iq) // nfft
+    if n_seg == 0:
+        raise ValueError("Need at least {} samples".format(nfft))
+    window = np.hanning(nfft).astype(np.float32)
+    segs = np.asarray(iq[:n_seg * nfft]).reshape(n_seg, nfft) * window
+    spec = np.fft.fftshift(np.fft.fft(segs, axis=1), axes=1)
+    psd = np.mean(np.abs(spec) ** 2, axis=0) / np.sum(window ** 2)
+    freqs = np.fft.fftshift(np.fft.fftfreq(nfft, 1.0 / samp_rate))
+    return freqs, 10 * np.log10(psd + 1e-20)
+
+
+def window_power(iq, window=WINDOW):
+    """Mean power per window of samples (default: one OFDM symbol at 20 MHz)."""
+    n_win = len(iq) // window
+    segs = np.asarray(iq[:n_win * window]).reshape(n_win, window)
+    return np.mean(segs.real ** 2 + segs.imag ** 2, axis=1)
+
+
+def window_power_db(iq, window=WINDOW):
+    return 10 * np.log10(window_power(iq, window) + 1e-20)
+
+
+def noise_floor(power_db, percentile=10):
+    """
+        Noise floor (dB) estimated from the window power of one snapshot;
+        only valid if the channel was idle for more than percentile % of
+        the snapshot.
+    """
+    return float(np.percentile(power_db, percentile))
+
+
+def duty_cycle(power_db, noise_floor_db, threshold_db=6.0):
+    """Fraction of windows threshold_db above the noise floor."""
+    return float(np.mean(np.asarray(power_db) > noise_floor_db + threshold_db))
+
+
+def analyze(iq, samp_rate, nfft=NFFT, window=WINDOW, threshold_db=6.0,
+            noise_floor_db=None):
+    """
+        Signal-quality summary of a snapshot:
+        - psd_db/freqs: power spectrum
+        - noise_floor_db: the given absolute noise floor (e.g. from a
+          calibration or measured over several channels, see
+          ChannelSelector), otherwise estimated from the snapshot (see
+          noise_floor), which takes a channel busy most of the time for
+          idle
+        - duty_cycle: fraction of windows threshold_db above the noise floor
+        - occupied_bw: fraction of the spectrum above noise floor + threshold
+        - interference_db: median power of the busy windows over the noise
+          floor (None if the channel was idle)
+    """
+    if len(iq) < max(nfft, window):
+        raise ValueError("Need at least {} samples".format(max(nfft, window)))
+    freqs, psd_db = power_spectrum(iq, samp_rate, nfft)
+    power_db = window_power_db(iq, window)
+    if noise_floor_db is None:
+        noise_floor_db = noise_floor(power_db)
+        psd_floor_db = float(np.percentile(psd_db, 10))
+    else:
+        # white noise has the same level per bin as per window
+        psd_floor_db = noise_floor_db
+    busy = power_db > noise_floor_db + threshold_db
+    return {
+        'freqs': freqs,
+        'psd_db': psd_db,
+        'noise_floor_db': noise_floor_db,
+        'duty_cycle': duty_cycle(power_db, noise_floor_db, threshold_db),
+        'occupied_bw': float(np.mean(psd_db > psd_floor_db + threshold_db)),
+        'interference_db': (float(np.median(power_db[busy]) - noise_floor_db)
+                            if busy.any() else None),
+    }
+
+
+def capture(path, n_samples, host='localhost', port=8080, timeout=5.0):
+    """
+        Snapshot of n_samples from a running transceiver (without agent):
+        arms the IQ tap through the XML-RPC interface of the flow graph
+        and returns a copy of the samples (None on timeout).
+    """
+    from xmlrpc.client import ServerProxy
+    buf = IqSnapshotBuffer(path)
+    if not buf.exists():
+        raise IOError("IQ snapshot buffer {} not available".format(path))
+    if not 0 < n_samples <= buf.size:
+        raise ValueError("n_samples {} out of range [1, {}]"
+                         .format(n_samples, buf.size))
+    try:
+        seq = buf.seq() + 1
+        ServerProxy('http://{}:{}'.format(host, port)).set_iq_capture(n_samples)
+        samples = buf.wait(seq, timeout)
+        return None if samples is None else np.array(samples)
+    finally:
+        buf.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description='Record an IQ snapshot from a running node, e.g. for '
+                    'gr_scripts/uniflex_wifi_replay.py')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8080,
+                        help='XML-RPC port of the node (ctrl_socket_port)')
+    parser.add_argument('--path',
+                        help='snapshot buffer of the node (iq_capture_path, '
+                             'default /dev/shm/uniflex_iq_<port>)')
+    parser.add_argument('--samples', type=int, required=True,
+                        help='at most the buffer size (iq_capture_size)')
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('-o', '--output', default='/dev/shm/uniflex_iq.fc32')
+    args = parser.parse_args()
+
+    path = args.path or '/dev/shm/uniflex_iq_{}'.format(args.port)
+    samples = capture(path, args.samples, args.host, args.port, args.timeout)
+    if samples is None:
+        raise SystemExit('IQ capture timed out after {}s'.format(args.timeout))
+    samples.tofile(args.output)
+    print('Recorded {} samples to {}'.format(len(samples), args.output))
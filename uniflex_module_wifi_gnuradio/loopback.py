@@ -0,0 +1,121 @@
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+
+class LoopbackChannel(object):
+    """
+        Simulated PHY replacing the USRP source/sink of the transceiver.
+
+        The TX samples are pushed on a local ZeroMQ socket (tx_address),
+        the RX samples are pulled from rx_address, played into a
+        continuous stream at samp_rate like a USRP delivers it (after
+        latency seconds of jitter buffer, gr_scripts/uniflex_zmq_rx.py)
+        and passed through a channel model (AWGN, CFO, multipath,
+        sampling offset). Connect two
+        transceivers by crossing the addresses:
+            n0: tx_address=A, rx_address=B
+            n1: tx_address=B, rx_address=A
+        With tx_address == rx_address a node receives its own frames.
+        Nodes on one host (network namespaces share /tmp and /dev/shm)
+        need distinct ctrl_socket_ports, the notification and IQ snapshot
+        endpoints are derived from it.
+
+        noise_voltage, freq_offset and taps are flow graph variables and
+        can be changed at run time (see set_loopback_channel).
+
+        interferers ({channel: (duty_cycle, amplitude)}) adds bursty noise
+        to the RX samples while the node is tuned to one of the channels
+        (gr_scripts/uniflex_interferer.py), e.g. to test channel
+        selection.
+    """
+
+    def __init__(self, tx_address="ipc:///tmp/uniflex_loopback_n0",
+                 rx_address="ipc:///tmp/uniflex_loopback_n1",
+                 noise_voltage=0.0, freq_offset=0.0, taps=(1.0,),
+                 epsilon=1.0, seed=0, throttle=True, interferers=None,
+                 latency=0.01):
+        self.tx_address = tx_address
+        self.rx_address = rx_address
+        # noise voltage (std. dev. of the AWGN, signal has unit power)
+        self.noise_voltage = noise_voltage
+        # CFO normalized to the sample rate
+        self.freq_offset = freq_offset
+        # multipath channel impulse response
+        self.taps = list(taps)
+        # sampling clock offset ratio (1.0 = none)
+        self.epsilon = epsilon
+        self.seed = seed
+        # run the TX at samp_rate instead of as fast as possible
+        self.throttle = throttle
+        self.interferers = dict(interferers) if interferers else {}
+        self.latency = latency
+
+    @staticmethod
+    def pair(noise_voltage=0.0, freq_offset=0.0, taps=(1.0,), **kwargs):
+        """Return channels for two connected nodes (n0, n1)."""
+        a = "ipc:///tmp/uniflex_loopback_n0"
+        b = "ipc:///tmp/uniflex_loopback_n1"
+        n0 = LoopbackChannel(a, b, noise_voltage, freq_offset, taps, **kwargs)
+        n1 = LoopbackChannel(b, a, noise_voltage, freq_offset, taps, **kwargs)
+        return n0, n1
+
+    @staticmethod
+    def interferer_list(interferers):
+        """{channel: (duty_cycle, amplitude)} as [[freq, duty, amplitude]]."""
+        import pyric.utils.channels as channels
+        return [[channels.ch2rf(int(ch)) * 1e6, float(duty), float(amplitude)]
+                for ch, (duty, amplitude) in sorted(interferers.items())]
+
+    def apply(self, fg, rx_code, interferer_code=None):
+        """
+            Replace the UHD blocks of GrcFlowGraph fg by the channel model;
+            rx_code is the source of the receiver block, interferer_code
+            the one of the interferer block, required with interferers.
+        """
+        fg.remove_block('uhd_usrp_source_0')
+        fg.remove_block('uhd_usrp_sink_0')
+
+        fg.add_block('variable', 'chan_noise_voltage', (1080, 12),
+                     value=self.noise_voltage)
+        fg.add_block('variable', 'chan_freq_offset', (1080, 76),
+                     value=self.freq_offset)
+        fg.add_block('variable', 'chan_taps', (1080, 140),
+                     value=repr([complex(t) for t in self.taps]))
+
+        # TX: packet_pad2 -> (throttle) -> ZeroMQ push
+        fg.add_block('zeromq_push_sink', 'zeromq_push_sink_0', (816, 744),
+                     type='complex', vlen=1, address=repr(self.tx_address),
+                     timeout=100, pass_tags=False, hwm=-1)
+        tx_src = 'foo_packet_pad2_0'
+        if self.throttle:
+            fg.add_block('blocks_throttle', 'blocks_throttle_0', (640, 744),
+                         type='complex', vlen=1, samples_per_second='samp_rate',
+                         ignoretag=True)
+            fg.connect(tx_src, 0, 'blocks_throttle_0', 0)
+            tx_src = 'blocks_throttle_0'
+        fg.connect(tx_src, 0, 'zeromq_push_sink_0', 0)
+
+        # RX: ZeroMQ pull (continuous stream) -> channel model -> PHY
+        fg.add_block('epy_block', 'uniflex_zmq_rx_0', (816, 840),
+                     _source_code=rx_code, address=repr(self.rx_address),
+                     samp_rate='samp_rate', latency=self.latency)
+        fg.add_block('channels_channel_model', 'channels_channel_model_0',
+                     (816, 920), noise_voltage='chan_noise_voltage',
+                     freq_offset='chan_freq_offset', epsilon=self.epsilon,
+                     taps='chan_taps', seed=self.seed, block_tags=False)
+        fg.connect('uniflex_zmq_rx_0', 0, 'channels_channel_model_0', 0)
+        rx_src = 'channels_channel_model_0'
+        if self.interferers:
+            if interferer_code is None:
+                raise ValueError("interferers require the interferer block")
+            fg.add_block('variable', 'chan_interferers', (1080, 204),
+                         value=repr(self.interferer_list(self.interferers)))
+            fg.add_block('epy_block', 'uniflex_interferer_0', (816, 1000),
+                         _source_code=interferer_code, freq='freq',
+                         interferers='chan_interferers', seed=self.seed)
+            fg.connect(rx_src, 0, 'uniflex_interferer_0', 0)
+            rx_src = 'uniflex_interferer_0'
+        fg.connect(rx_src, 0, 'wifi_phy_hier_0', 0)
+        return fg
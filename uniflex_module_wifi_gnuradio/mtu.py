@@ -0,0 +1,89 @@
+import math
+
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+'''
+    Goodput model of the transceiver used to select the MTU.
+
+    A frame carries one IP packet of size mtu in a data frame
+    (MAC header + LLC/SNAP + payload + FCS). The airtime follows the
+    802.11a OFDM timing scaled to samp_rate; foo.packet_pad2 adds
+    pad_samples of silence around every burst, which is the dominant
+    per-frame overhead of the flow graph at small MTUs.
+'''
+
+MAC_HEADER = 24
+LLC_HEADER = 8
+FCS = 4
+
+# gr-ieee802-11 limits the PSDU (MAX_PSDU_SIZE, 1500 + 28), the IP packet
+# shares it with the MAC header, LLC/SNAP and FCS
+MAX_PSDU = 1528
+MAX_MTU = MAX_PSDU - MAC_HEADER - LLC_HEADER - FCS
+MIN_MTU = 68
+# IPv4 + TCP
+TCPIP_HEADER = 40
+
+# data bits per OFDM symbol for encoding 0..7
+# (BPSK 1/2, BPSK 3/4, QPSK 1/2, QPSK 3/4, 16QAM 1/2, 16QAM 3/4,
+#  64QAM 2/3, 64QAM 3/4)
+DATA_BITS_PER_SYMBOL = [24, 36, 48, 72, 96, 144, 192, 216]
+
+# received frames (decoded + lost) per link quality estimate
+FER_MIN_FRAMES = 100
+
+# flow graph defaults: samp_rate and packet_pad2(pad_front + pad_tail)
+SAMP_RATE = 5e6
+PAD_SAMPLES = 20000
+
+
+def mss_for_mtu(mtu):
+    return mtu - TCPIP_HEADER
+
+
+def psdu_length(mtu):
+    return MAC_HEADER + LLC_HEADER + mtu + FCS
+
+
+def frame_airtime(mtu, encoding, samp_rate=SAMP_RATE, pad_samples=PAD_SAMPLES):
+    """Time on air in seconds of a frame carrying an IP packet of mtu bytes."""
+    n_dbps = DATA_BITS_PER_SYMBOL[encoding]
+    # SERVICE (16) + PSDU + tail (6) bits
+    n_sym = int(math.ceil((16 + 8 * psdu_length(mtu) + 6) / float(n_dbps)))
+    # preamble (16 us) + SIGNAL (4 us) + data symbols at 20 MHz
+    airtime_20mhz = 20e-6 + 4e-6 * n_sym
+    return airtime_20mhz * 20e6 / samp_rate + pad_samples / samp_rate
+
+
+def ber_from_fer(fer, mtu):
+    """Bit error rate explaining a frame error rate fer measured at mtu."""
+    if fer <= 0.0:
+        return 0.0
+    if fer >= 1.0:
+        return 1.0
+    return 1.0 - (1.0 - fer) ** (1.0 / (8 * psdu_length(mtu)))
+
+
+def goodput(mtu, encoding, ber=0.0, samp_rate=SAMP_RATE,
+            pad_samples=PAD_SAMPLES):
+    """Expected TCP goodput in bit/s for back-to-back frames."""
+    success = (1.0 - ber) ** (8 * psdu_length(mtu))
+    return (8 * mss_for_mtu(mtu) * success /
+            frame_airtime(mtu, encoding, samp_rate, pad_samples))
+
+
+def best_mtu(encoding, fer=0.0, fer_mtu=MAX_MTU, samp_rate=SAMP_RATE,
+             pad_samples=PAD_SAMPLES, candidates=None):
+    """
+        Return the MTU maximizing the goodput for the encoding and the
+        link quality given as frame error rate fer measured at fer_mtu.
+    """
+    if candidates is None:
+        candidates = range(MIN_MTU, MAX_MTU + 1)
+    ber = ber_from_fer(fer, fer_mtu)
+    return max(candidates,
+               key=lambda mtu: goodput(mtu, encoding, ber, samp_rate,
+                                       pad_samples))
@@ -0,0 +1,115 @@
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+
+class Neighbor(object):
+    """
+        Peer station reachable over the transceiver.
+    """
+    __slots__ = ('ipv4_address', 'mac', 'last_seen', 'encoding', 'snr',
+                 'rx_frames', 'rx_bytes', 'rx_lost', 'tx_frames', 'tx_bytes',
+                 'peer_snr', 'peer_snr_time')
+
+    def __init__(self, ipv4_address, mac):
+        self.ipv4_address = ipv4_address
+        self.mac = mac
+        self.last_seen = None
+        self.encoding = None
+        self.snr = None
+        self.rx_frames = 0
+        self.rx_bytes = 0
+        self.rx_lost = 0
+        self.tx_frames = 0
+        self.tx_bytes = 0
+        # SNR of our frames as measured by the neighbor
+        self.peer_snr = None
+        self.peer_snr_time = None
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+def normalize_mac(mac):
+    return ':'.join('{:02x}'.format(int(x, 16)) for x in mac.split(':'))
+
+
+class NeighborTable(object):
+    """
+        IPv4 -> MAC neighbor table of the module, indexed by address and
+        MAC for constant time lookup in both directions. The counters are
+        updated from the per-neighbor statistics of the transceiver.
+    """
+
+    def __init__(self):
+        self._by_ipv4 = {}
+        self._by_mac = {}
+
+    def __len__(self):
+        return len(self._by_ipv4)
+
+    def __iter__(self):
+        return iter(list(self._by_ipv4.values()))
+
+    def __contains__(self, ipv4_address):
+        return ipv4_address in self._by_ipv4
+
+    def get(self, ipv4_address):
+        return self._by_ipv4.get(ipv4_address)
+
+    def get_by_mac(self, mac):
+        return self._by_mac.get(normalize_mac(mac))
+
+    def add(self, ipv4_address, mac):
+        # returns the neighbor if it is new or its MAC changed; the
+        # statistics are per MAC, so one MAC has at most one address
+        mac = normalize_mac(mac)
+        nb = self._by_ipv4.get(ipv4_address)
+        other = self._by_mac.get(mac)
+        if other is not None and other is not nb:
+            raise ValueError("MAC {} already used by neighbor {}"
+                             .format(mac, other.ipv4_address))
+        if nb is not None:
+            if nb.mac == mac:
+                return None
+            self._by_mac.pop(nb.mac, None)
+            nb.mac = mac
+        else:
+            nb = Neighbor(ipv4_address, mac)
+            self._by_ipv4[ipv4_address] = nb
+        self._by_mac[mac] = nb
+        return nb
+
+    def remove(self, ipv4_address):
+        nb = self._by_ipv4.pop(ipv4_address, None)
+        if nb is not None:
+            self._by_mac.pop(nb.mac, None)
+        return nb
+
+    def update_stats(self, neighbors, timestamp):
+        for mac, stats in neighbors.items():
+            nb = self._by_mac.get(mac)
+            if nb is None:
+                continue
+            nb.rx_frames += stats['rx_frames']
+            nb.rx_bytes += stats['rx_bytes']
+            nb.rx_lost += stats.get('rx_lost', 0)
+            nb.tx_frames += stats['tx_frames']
+            nb.tx_bytes += stats['tx_bytes']
+            if stats['rx_frames']:
+                nb.last_seen = timestamp
+            if stats.get('snr') is not None:
+                nb.snr = stats['snr']
+            if stats.get('encoding') is not None:
+                nb.encoding = stats['encoding']
+
+
+def neigh_batch(neighbors, iface, delete=False):
+    """Commands for `ip -batch -` adding/removing static ARP entries."""
+    if delete:
+        return ''.join('neigh del {} dev {}\n'.format(nb.ipv4_address, iface)
+                       for nb in neighbors)
+    return ''.join('neigh replace {} lladdr {} dev {} nud permanent\n'
+                   .format(nb.ipv4_address, nb.mac, iface)
+                   for nb in neighbors)
@@ -0,0 +1,102 @@
+import json
+import logging
+import threading
+from uniflex.core import events
+
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+
+class WiFiParameterChangedEvent(events.EventBase):
+    """
+        Transceiver parameter(s) changed; params holds the new values
+        as reported by the flow graph (e.g. {'freq': 5890000000}).
+    """
+    def __init__(self, params, timestamp=None):
+        super().__init__()
+        self.params = params
+        self.timestamp = timestamp
+
+
+class WiFiPhyMacStatsEvent(events.EventBase):
+    """
+        Periodic PHY/MAC counters of the transceiver for the last
+        reporting interval; neighbors holds the counters per peer MAC
+        address (rx_frames, rx_bytes, rx_lost, tx_frames, tx_bytes, snr,
+        encoding); rx_lost counts the frames missed from the neighbor
+        (gaps in its sequence numbers).
+    """
+    def __init__(self, interval, rx_frames, rx_bytes, tx_frames, tx_bytes,
+                 snr=None, timestamp=None, neighbors=None):
+        super().__init__()
+        self.interval = interval
+        self.rx_frames = rx_frames
+        self.rx_bytes = rx_bytes
+        self.tx_frames = tx_frames
+        self.tx_bytes = tx_bytes
+        self.snr = snr
+        self.timestamp = timestamp
+        self.neighbors = neighbors if neighbors is not None else {}
+
+
+def message_to_event(msg):
+    msg_type = msg.get('type')
+    if msg_type == 'param':
+        return WiFiParameterChangedEvent(msg['params'], msg.get('time'))
+    if msg_type == 'stats':
+        return WiFiPhyMacStatsEvent(msg['interval'],
+                                    msg['rx_frames'], msg['rx_bytes'],
+                                    msg['tx_frames'], msg['tx_bytes'],
+                                    msg.get('snr'), msg.get('time'),
+                                    msg.get('neighbors'))
+    return None
+
+
+class NotificationSubscriber(threading.Thread):
+    """
+        Receives the notifications published by the transceiver
+        (gr_scripts/uniflex_notifier.py) and hands them as UniFlex
+        events to callback.
+    """
+
+    def __init__(self, address, callback, poll_timeout_ms=500):
+        super().__init__()
+        self.daemon = True
+        self.log = logging.getLogger('WiFiGnuRadioModule.notifications')
+        self.address = address
+        self.callback = callback
+        self.poll_timeout_ms = poll_timeout_ms
+        self._running = True
+
+    def run(self):
+        import zmq
+        socket = zmq.Context.instance().socket(zmq.SUB)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.setsockopt(zmq.SUBSCRIBE, b'')
+        socket.connect(self.address)
+        try:
+            while self._running:
+                if not socket.poll(self.poll_timeout_ms):
+                    continue
+                try:
+                    msg = json.loads(socket.recv().decode('utf-8'))
+                except ValueError as e:
+                    self.log.warning("Dropping malformed notification: {}"
+                                     .format(e))
+                    continue
+                event = message_to_event(msg)
+                if event is None:
+                    continue
+                # a failing handler must not end the subscription
+                try:
+                    self.callback(event)
+                except Exception:
+                    self.log.exception("Handling {} failed"
+                                       .format(type(event).__name__))
+        finally:
+            socket.close()
+
+    def stop(self):
+        self._running = False
@@ -0,0 +1,169 @@
+import os
+import argparse
+import threading
+from collections import OrderedDict
+from .grc import GrcFlowGraph
+
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+'''
+    Parameterized transceiver radio program.
+
+    gr_scripts/uniflex_wifi_transceiver.grc is the only copy of the
+    transceiver; the per-node values (name, MACs, USRP address, XML-RPC
+    port, tap device, gains, buffer profile) are filled in when a node is
+    instantiated. Parsed templates and generated programs are cached per
+    process, nodes with the same configuration share one program.
+
+    Render a node for use without agent, e.g.:
+        python -m uniflex_module_wifi_gnuradio.template \\
+            --name uniflex_wifi_transceiver_n1 --src-mac 12:34:56:78:90:ab \\
+            --dst-mac 30:14:4a:e6:46:e4 -o uniflex_wifi_transceiver_n1.grc
+'''
+
+TEMPLATE = "uniflex_wifi_transceiver"
+
+# max_noutput_items of the blocks (GRC maxoutbuf, 0: scheduler default)
+# and UHD transport frames; small buffers keep the queueing delay low,
+# large ones ride out scheduling jitter at high sample rates
+BUFFER_PROFILES = {
+    'default': {'maxoutbuf': 0, 'dev_args': ''},
+    'low_latency': {'maxoutbuf': 4096,
+                    'dev_args': 'num_recv_frames=32,num_send_frames=32'},
+    'throughput': {'maxoutbuf': 0,
+                   'dev_args': 'num_recv_frames=512,num_send_frames=512'},
+}
+
+# output buffer of a block with maxoutbuf 0 (GNU Radio default, complex
+# samples), i.e. at most this many samples queued per block
+DEFAULT_BUFFER_ITEMS = 32768
+
+MAX_PROGRAMS = 32
+
+_lock = threading.Lock()
+_sources = {}
+_templates = {}
+_programs = OrderedDict()
+
+
+def template_path(gr_scripts_path, name=TEMPLATE):
+    return os.path.join(gr_scripts_path, name + ".grc")
+
+
+def read_source(path):
+    """Content of path (e.g. an embedded block), cached until modified."""
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _sources.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as f:
+            cached = (mtime, f.read())
+        with _lock:
+            _sources[path] = cached
+    return cached[1]
+
+
+def load(path):
+    """Return a (private) copy of the parsed template at path."""
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _templates.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, GrcFlowGraph(read_source(path)))
+        with _lock:
+            _templates[path] = cached
+    return cached[1].copy()
+
+
+def mac_literal(mac):
+    """'12:34:56:78:90:ab' as flow graph value [0x12, 0x34, ...]."""
+    return '[' + ', '.join('0x{:02x}'.format(int(b, 16))
+                           for b in mac.split(':')) + ']'
+
+
+def instantiate(fg, name=TEMPLATE, src_mac=None, dst_mac=None, bss_mac=None,
+                usrp_addr=None, ctrl_port=None, tap_iface=None, mtu=None,
+                tx_gain=None, rx_gain=None, buffer_profile='default'):
+    """Fill the node parameters into the transceiver GrcFlowGraph fg."""
+    if buffer_profile not in BUFFER_PROFILES:
+        raise ValueError("Unknown buffer profile {}".format(buffer_profile))
+
+    # the options id names the generated top block
+    for options_id in fg.block_ids('options'):
+        fg.set_param(options_id, 'id', name)
+    for var, mac in (('src_mac', src_mac), ('dst_mac', dst_mac),
+                     ('bss_mac', bss_mac)):
+        if mac is not None:
+            fg.set_variable(var, mac_literal(mac))
+    if usrp_addr is not None:
+        fg.set_variable('usrp_addr', repr(usrp_addr))
+    if tx_gain is not None:
+        fg.set_variable('tx_gain', tx_gain)
+    if rx_gain is not None:
+        fg.set_variable('rx_gain', rx_gain)
+    if ctrl_port is not None:
+        fg.set_param('xmlrpc_server_0', 'port', ctrl_port)
+    if tap_iface is not None:
+        fg.set_param('blocks_tuntap_pdu_0', 'ifn', tap_iface)
+    if mtu is not None:
+        fg.set_param('blocks_tuntap_pdu_0', 'mtu', mtu)
+
+    profile = BUFFER_PROFILES[buffer_profile]
+    fg.set_param_all('maxoutbuf', profile['maxoutbuf'])
+    for block_id in ('uhd_usrp_source_0', 'uhd_usrp_sink_0'):
+        if profile['dev_args'] and fg.has_block(block_id):
+            fg.set_param(block_id, 'dev_args', repr(profile['dev_args']))
+    return fg
+
+
+def cached(key, generate):
+    """Return the program cached under key, generate() it on a miss."""
+    with _lock:
+        xml = _programs.get(key)
+        if xml is not None:
+            _programs.move_to_end(key)
+            return xml
+    xml = generate()
+    with _lock:
+        _programs[key] = xml
+        while len(_programs) > MAX_PROGRAMS:
+            _programs.popitem(last=False)
+    return xml
+
+
+def clear_cache():
+    with _lock:
+        _sources.clear()
+        _templates.clear()
+        _programs.clear()
+
+
+if __name__ == '__main__':
+    gr_scripts = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              os.pardir, "gr_scripts")
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--template', default=template_path(gr_scripts))
+    parser.add_argument('--name', default=TEMPLATE)
+    parser.add_argument('--src-mac')
+    parser.add_argument('--dst-mac')
+    parser.add_argument('--bss-mac')
+    parser.add_argument('--usrp-addr')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--tap')
+    parser.add_argument('--mtu', type=int)
+    parser.add_argument('--tx-gain', type=float)
+    parser.add_argument('--rx-gain', type=float)
+    parser.add_argument('--buffer-profile', default='default',
+                        choices=sorted(BUFFER_PROFILES))
+    parser.add_argument('-o', '--output', required=True)
+    args = parser.parse_args()
+
+    fg = instantiate(load(args.template), args.name, args.src_mac,
+                     args.dst_mac, args.bss_mac, args.usrp_addr, args.port,
+                     args.tap, args.mtu, args.tx_gain, args.rx_gain,
+                     args.buffer_profile)
+    with open(args.output, 'w') as f:
+        f.write(fg.to_xml())
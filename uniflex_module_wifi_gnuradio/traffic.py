@@ -0,0 +1,106 @@
+import time
+import socket
+import struct
+
+__author__ = "Anatolij Zubow, Piotr Gawlowicz"
+__copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
+__version__ = "0.1.0"
+__email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
+
+'''
+    UDP traffic through the tap device: the peer runs serve(), the
+    measuring node uses UdpProbe. Data packets are counted by the peer
+    and reported on request, ping packets are echoed.
+'''
+
+PORT = 5201
+MSG_DATA = b'D'
+MSG_PING = b'P'
+MSG_REPORT = b'R'
+
+# IPv4 + UDP header
+UDP_OVERHEAD = 28
+
+
+def serve(port=PORT):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('', port))
+    rx_bytes = 0
+    rx_pkts = 0
+    while True:
+        data, addr = sock.recvfrom(65535)
+        kind = data[:1]
+        if kind == MSG_DATA:
+            rx_bytes += len(data)
+            rx_pkts += 1
+        elif kind == MSG_PING:
+            sock.sendto(data, addr)
+        elif kind == MSG_REPORT:
+            sock.sendto(MSG_REPORT + struct.pack('!QQ', rx_bytes, rx_pkts),
+                        addr)
+            rx_bytes = 0
+            rx_pkts = 0
+
+
+class UdpProbe(object):
+
+    def __init__(self, peer, port=PORT, timeout=1.0):
+        self.peer = (peer, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(timeout)
+
+    def close(self):
+        self.sock.close()
+
+    def _report(self):
+        for _ in range(5):
+            self.sock.sendto(MSG_REPORT, self.peer)
+            try:
+                reply = self.sock.recv(64)
+            except socket.timeout:
+                continue
+            if reply[:1] == MSG_REPORT:
+                return struct.unpack('!QQ', reply[1:17])
+        return None
+
+    def throughput(self, mtu, duration, rate_pps):
+        """Return (goodput in bit/s, delivery ratio) or (None, None)."""
+        data = MSG_DATA + b'\x00' * (mtu - UDP_OVERHEAD - 1)
+        # discard what is left from a previous measurement
+        self._report()
+        tx_pkts = 0
+        start = time.time()
+        while time.time() - start < duration:
+            self.sock.sendto(data, self.peer)
+            tx_pkts += 1
+            # pace the sender, the tap queue drops everything above the PHY rate
+            time.sleep(max(0.0, start + tx_pkts / rate_pps - time.time()))
+        # let the frames in flight arrive before asking for the report
+        time.sleep(0.5)
+        report = self._report()
+        if report is None:
+            return None, None
+        rx_bytes, rx_pkts = report
+        return rx_bytes * 8 / duration, rx_pkts / float(tx_pkts)
+
+    def latency(self, count):
+        """Return the round trip times in seconds of the answered pings."""
+        rtts = []
+        for seq in range(count):
+            data = MSG_PING + struct.pack('!I', seq)
+            start = time.time()
+            self.sock.sendto(data, self.peer)
+            try:
+                while self.sock.recv(64) != data:
+                    pass
+                rtts.append(time.time() - start)
+            except socket.timeout:
+                pass
+        return rtts
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[int(p * (len(values) - 1))]
@@ -1,10 +1,20 @@
 import os
-import sh
 import time
+import ipaddress
 import logging
-import pyric.utils.channels as channels
+import threading
+from collections import defaultdict
 import uniflex_module_gnuradio
 from uniflex.core import modules
+from . import template as grc_template
+from .loopback import LoopbackChannel
+from . import mtu as mtu_model
+from .notifications import NotificationSubscriber, WiFiPhyMacStatsEvent
+from .neighbors import NeighborTable, neigh_batch, normalize_mac
+from .channel_selection import ChannelSelector
+
+# sh, pyric and numpy (iq, calibration) are imported where they are used,
+# constructing the module does not load them
 
 __author__ = "Anatolij Zubow, Piotr Gawlowicz"
 __copyright__ = "Copyright (c) 2015, Technische Universität Berlin"
@@ -12,6 +22,17 @@ __version__ = "0.1.0"
 __email__ = "{zubow, gawlowicz}@tkn.tu-berlin.de"
 
 
+# embedded blocks (gr_scripts) added to the template, programs are
+# regenerated when one of them changes
+BLOCK_SOURCES = ("uniflex_encap.py", "uniflex_notifier.py",
+                 "uniflex_iq_tap.py", "uniflex_interferer.py",
+                 "uniflex_zmq_rx.py")
+
+# IQ captures through one snapshot buffer (i.e. of one transceiver) are
+# serialized over all module instances
+_capture_locks = defaultdict(threading.Lock)
+
+
 class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
     """
         WiFi GNURadio connector module.
@@ -27,6 +48,15 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
         - encoding *
         - chan_est *
         - lo_offset *
+        - notify_address: parameter changes and PHY/MAC counters as events
+        - loopback: simulated PHY instead of the USRP
+        - mtu/mss, auto_mtu: MTU selected by a goodput model (tune_mtu)
+        - neighbors: many stations per node (add_neighbors)
+        - tx_calibration/rx_calibration: TX power/RX gain in dBm/dB,
+          target_snr: closed-loop TX power (report_peer_stats)
+        - iq_capture_size: IQ snapshots of the RX samples (capture_iq)
+        - channel_selection: interference-aware channel selection
+        - template: one transceiver template for all nodes (template.py)
         - * (not yet implemented)
 
         Howto:
@@ -35,7 +65,7 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
         2) read/write parameters
     """
 
-    def __init__(self, usrp_addr="addr=192.168.30.2",
+    def __init__(self, usrp_addr="addr=192.168.10.2",
                  ctrl_socket_host="localhost",
                  ctrl_socket_port=8080,
                  src_mac="12:34:56:78:90:ab",
@@ -43,17 +73,90 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
                  bss_mac="66:66:66:66:66:66",
                  src_ipv4_address="192.168.123.1",
                  dst_ipv4_address="192.168.123.2",
-                 gnu_rp_name="uniflex_wifi_transceiver"):
+                 gnu_rp_name="uniflex_wifi_transceiver",
+                 template=grc_template.TEMPLATE,
+                 tap_iface="tap0",
+                 subnet="192.168.123.0/24",
+                 tx_gain=None,
+                 rx_gain=None,
+                 buffer_profile="default",
+                 notify_address="ipc:///tmp/uniflex_wifi_gnuradio_{port}",
+                 notify_interval=1.0,
+                 loopback=None,
+                 mtu=440,
+                 mss=None,
+                 auto_mtu=False,
+                 neighbors=None,
+                 tx_calibration=None,
+                 rx_calibration=None,
+                 target_snr=None,
+                 iq_capture_size=0,
+                 iq_capture_path=None,
+                 channel_selection=None):
 
         super(WiFiGnuRadioModule, self).__init__(usrp_addr, ctrl_socket_host,
                                                  ctrl_socket_port)
 
         self.log = logging.getLogger('WiFiGnuRadioModule')
-        self.uniflex_path = os.environ['UNIFLEX_PATH']
         self.grc_radio_program_name = gnu_rp_name
-
-        self.fid = open(os.path.join(self.uniflex_path, "modules", "wifi_gnuradio", "gr_scripts", gnu_rp_name + ".grc"))
-        self.grc_xml = self.fid.read()
+        # the XML-RPC proxy is shared by the agent, the notification and
+        # the channel selection threads
+        self._rpc_lock = threading.RLock()
+
+        # radio program, built on first use (see grc_xml)
+        self._gr_scripts_path = None
+        self._grc_xml = None
+        self.template = template
+        if buffer_profile not in grc_template.BUFFER_PROFILES:
+            raise ValueError("Unknown buffer profile {}".format(buffer_profile))
+        self.usrp_addr = usrp_addr
+        self.ctrl_socket_port = ctrl_socket_port
+        self.tx_gain = tx_gain
+        self.rx_gain = rx_gain
+        self.buffer_profile = buffer_profile
+
+        # Notifications
+        # one endpoint per transceiver, nodes on one host (or in network
+        # namespaces sharing /tmp) must not bind the same address
+        if notify_address is not None:
+            notify_address = notify_address.format(port=ctrl_socket_port)
+        self.notify_address = notify_address
+        self.notify_interval = notify_interval
+        self.notify_subscriber = None
+
+        # Simulated PHY
+        if isinstance(loopback, dict):
+            loopback = LoopbackChannel(**loopback)
+        self.loopback = loopback
+
+        # IQ capture
+        self.iq_capture_size = iq_capture_size
+        if iq_capture_path is None:
+            iq_capture_path = "/dev/shm/uniflex_iq_{}".format(ctrl_socket_port)
+        self.iq_capture_path = iq_capture_path
+        self._iq_buffer = None
+
+        # Channel selection
+        self.channel_selection = channel_selection
+        self.channel_selector = None
+        if channel_selection is not None:
+            if not self.iq_capture_size or self.notify_address is None:
+                raise ValueError("Channel selection requires IQ capture and notifications")
+
+        # MTU/MSS
+        self.auto_mtu = auto_mtu
+        self.max_mtu = mtu_model.MAX_MTU if auto_mtu else mtu
+        self.mtu = mtu
+        self.mss = mss if mss is not None else mtu_model.mss_for_mtu(mtu)
+        self.link_fer = 0.0
+        self.link_fer_mtu = mtu
+        self._fer_frames = 0
+        self._fer_lost = 0
+        self._fer_bytes = 0
+
+        # Interface, one tap device per node
+        self.tap_iface = tap_iface
+        self.subnet = ipaddress.ip_network(subnet)
 
         # WiFi Configuration
         self.src_mac = src_mac
@@ -62,15 +165,99 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
         self.src_ipv4_address = src_ipv4_address
         self.dst_ipv4_address = dst_ipv4_address
 
+        # Neighbors
+        if neighbors is None:
+            neighbors = {dst_ipv4_address: dst_mac}
+        self.neighbor_table = NeighborTable()
+        self.tap_configured = False
+        self.add_neighbors(neighbors)
+
+        # Calibration, loaded on first use
+        self.tx_calibration_file = tx_calibration
+        self.rx_calibration_file = rx_calibration
+        self._calibrations = {}
+        self.target_snr = target_snr
+        self._tx_power_controller = None
+        self.tx_power_dBm = None
+        if target_snr is not None and tx_calibration is None:
+            raise ValueError("TX power control requires tx_calibration")
+
         sh_logger = logging.getLogger('sh.command')
         sh_logger.setLevel(logging.CRITICAL)
 
+    def set_parameters(self, param_key_values):
+        with self._rpc_lock:
+            return super(WiFiGnuRadioModule, self).set_parameters(param_key_values)
+
+    def get_parameters(self, param_key_list):
+        with self._rpc_lock:
+            return super(WiFiGnuRadioModule, self).get_parameters(param_key_list)
+
+    @property
+    def gr_scripts_path(self):
+        if self._gr_scripts_path is None:
+            self._gr_scripts_path = os.path.join(os.environ['UNIFLEX_PATH'], "modules", "wifi_gnuradio", "gr_scripts")
+        return self._gr_scripts_path
+
+    @gr_scripts_path.setter
+    def gr_scripts_path(self, path):
+        self._gr_scripts_path = path
+        self._grc_xml = None
+
+    @property
+    def template_path(self):
+        return grc_template.template_path(self.gr_scripts_path, self.template)
+
+    @property
+    def grc_xml(self):
+        if self._grc_xml is None:
+            self._grc_xml = self._build_radio_program()
+        return self._grc_xml
+
+    @grc_xml.setter
+    def grc_xml(self, grc_xml):
+        self._grc_xml = grc_xml
+
+    @property
+    def iq_buffer(self):
+        if self._iq_buffer is None:
+            from .iq import IqSnapshotBuffer
+            self._iq_buffer = IqSnapshotBuffer(self.iq_capture_path)
+        return self._iq_buffer
+
+    def _calibration(self, path):
+        if path is None:
+            return None
+        if path not in self._calibrations:
+            from .calibration import GainCalibration
+            self._calibrations[path] = GainCalibration.load(path)
+        return self._calibrations[path]
+
+    @property
+    def tx_calibration(self):
+        return self._calibration(self.tx_calibration_file)
+
+    @property
+    def rx_calibration(self):
+        return self._calibration(self.rx_calibration_file)
+
+    @property
+    def tx_power_controller(self):
+        if self._tx_power_controller is None and self.target_snr is not None:
+            from .calibration import TxPowerController
+            lo, hi = self.tx_calibration.dbm_range(self.tx_calibration.freqs)
+            self._tx_power_controller = TxPowerController(
+                self.target_snr, min_dbm=float(lo.max()), max_dbm=float(hi.min()))
+        return self._tx_power_controller
+
     @modules.on_start()
     def _activate_rp(self):
+        import sh
         self.log.info('Activate GR80211 radio program')
+        self._start_notifications()
         self.activate_radio_program(self.grc_radio_program_name, self.grc_xml)
 
-        tapIface = "tap0"
+        tapIface = self.tap_iface
         while True:
             try:
                 time.sleep(1)
@@ -80,27 +267,260 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
                 self.log.debug("Waiting for device: {}".format(tapIface))
 
         self.set_src_mac(self.src_mac)
-        self.set_dst_mac(self.dst_mac)
         self.set_bss_mac(self.bss_mac)
 
         # configure interface
         sh.ifconfig(tapIface, "down")
         sh.ifconfig(tapIface, "hw", "ether", self.src_mac)
-        sh.ifconfig(tapIface, "mtu", 440)
-        sh.ifconfig(tapIface, self.src_ipv4_address, "netmask", "255.255.255.0", "up")
+        sh.ifconfig(tapIface, "mtu", self.mtu)
+        sh.ifconfig(tapIface, self.src_ipv4_address, "netmask", str(self.subnet.netmask), "up")
 
         # configure routing
-        sh.route("del", "-net", "192.168.123.0/24")
-        sh.route("add", "-net", "192.168.123.0/24", "mss", "400", "dev", tapIface)
+        self._configure_route()
 
         # configure arp
-        sh.arp("-s", self.dst_ipv4_address, self.dst_mac)
+        self.tap_configured = True
+        self._update_arp(list(self.neighbor_table))
+
+        if self.auto_mtu:
+            self.tune_mtu()
+
+        self._start_channel_selection()
+
+    def _configure_route(self):
+        import sh
+        sh.route("del", "-net", str(self.subnet))
+        sh.route("add", "-net", str(self.subnet), "mss", str(self.mss), "dev", self.tap_iface)
+
+    @modules.on_exit()
+    def _deactivate_rp(self):
+        self.tap_configured = False
+        self._stop_channel_selection()
+        self._stop_notifications()
+        self._close_iq_buffer()
 
     def deactivate_radio_program(self, grc_radio_program_name=None, do_pause=False):
         # override
         super(WiFiGnuRadioModule, self).deactivate_radio_program(self.grc_radio_program_name, False)
+        self.tap_configured = False
+        self._stop_channel_selection()
+        self._stop_notifications()
+        self._close_iq_buffer()
+
+    def _close_iq_buffer(self):
+        if self._iq_buffer is not None:
+            self._iq_buffer.close()
+
+    def _read_script(self, name):
+        return grc_template.read_source(os.path.join(self.gr_scripts_path, name))
+
+    def _build_radio_program(self):
+        loopback = None
+        if self.loopback is not None:
+            loopback = tuple(sorted((k, repr(v)) for k, v in vars(self.loopback).items()))
+        sources = tuple(os.path.getmtime(os.path.join(self.gr_scripts_path, name))
+                        for name in BLOCK_SOURCES)
+        key = (self.template_path, os.path.getmtime(self.template_path),
+               sources, self.grc_radio_program_name, self.src_mac, self.dst_mac,
+               self.bss_mac, self.usrp_addr, self.ctrl_socket_port,
+               self.tap_iface, self.max_mtu, self.tx_gain, self.rx_gain,
+               self.buffer_profile, self.notify_address, self.notify_interval,
+               loopback, self.iq_capture_size, self.iq_capture_path)
+        return grc_template.cached(key, self._generate_radio_program)
+
+    def _generate_radio_program(self):
+        fg = grc_template.instantiate(
+            grc_template.load(self.template_path),
+            name=self.grc_radio_program_name, src_mac=self.src_mac,
+            dst_mac=self.dst_mac, bss_mac=self.bss_mac,
+            usrp_addr=self.usrp_addr, ctrl_port=self.ctrl_socket_port,
+            tap_iface=self.tap_iface, mtu=self.max_mtu, tx_gain=self.tx_gain,
+            rx_gain=self.rx_gain, buffer_profile=self.buffer_profile)
+        self._add_encap(fg)
+        if self.notify_address is not None:
+            self._add_notifier(fg)
+        if self.loopback is not None:
+            interferer_code = None
+            if self.loopback.interferers:
+                interferer_code = self._read_script("uniflex_interferer.py")
+            self.loopback.apply(fg, self._read_script("uniflex_zmq_rx.py"),
+                                interferer_code)
+        if self.iq_capture_size:
+            self._add_iq_tap(fg)
+        return fg.to_xml()
+
+    def _add_encap(self, fg):
+        # frames are addressed to the Ethernet destination instead of the
+        # single dst_mac of ieee802_11.mac (see set_dst_mac)
+        encap = 'uniflex_encap_0'
+        fg.remove_block('ieee802_11_mac_0')
+        fg.disconnect('blocks_tuntap_pdu_0', 'pdus', 'ieee802_11_ether_encap_0', 'from tap')
+        fg.add_block('epy_block', encap, (608, 379),
+                     _source_code=self._read_script("uniflex_encap.py"),
+                     src_mac='src_mac', bss_mac='bss_mac')
+        fg.connect('blocks_tuntap_pdu_0', 'pdus', encap, 'from tap')
+        fg.connect(encap, 'phy out', 'wifi_phy_hier_0', 'mac_in')
+
+    def _add_notifier(self, fg):
+        notifier = 'uniflex_notifier_0'
+        params = {'_source_code': self._read_script("uniflex_notifier.py"),
+                  'address': repr(self.notify_address),
+                  'interval': self.notify_interval}
+        # the notifier is wired to the flow graph variables, GRC generates
+        # the callbacks which push every parameter change
+        for var in ['freq', 'samp_rate', 'rx_gain', 'tx_gain', 'encoding',
+                    'chan_est', 'lo_offset', 'src_mac', 'dst_mac', 'bss_mac']:
+            params[var] = var
+        fg.add_block('epy_block', notifier, (40, 600), **params)
+        fg.connect('wifi_phy_hier_0', 'mac_out', notifier, 'rx')
+        fg.connect('uniflex_encap_0', 'phy out', notifier, 'tx')
+
+    def _add_iq_tap(self, fg):
+        # tap whatever feeds the PHY (USRP or loopback channel model)
+        src = None
+        for conn in fg.connections('wifi_phy_hier_0'):
+            if (conn.findtext('sink_block_id') == 'wifi_phy_hier_0' and
+                    conn.findtext('sink_key') == '0'):
+                src = (conn.findtext('source_block_id'), conn.findtext('source_key'))
+        if src is None:
+            self.log.warning('No RX input of wifi_phy_hier_0, IQ capture disabled')
+            return
+        fg.add_block('variable', 'iq_capture', (1000, 10), value=0)
+        fg.add_block('epy_block', 'uniflex_iq_tap_0', (40, 700),
+                     _source_code=self._read_script("uniflex_iq_tap.py"),
+                     path=repr(self.iq_capture_path),
+                     size=self.iq_capture_size,
+                     capture='iq_capture')
+        fg.connect(src[0], src[1], 'uniflex_iq_tap_0', 0)
+
+    def _start_notifications(self):
+        if self.notify_address is None or self.notify_subscriber is not None:
+            return
+        self.notify_subscriber = NotificationSubscriber(self.notify_address,
+                                                        self._on_notification)
+        self.notify_subscriber.start()
+
+    def _stop_notifications(self):
+        if self.notify_subscriber is not None:
+            self.notify_subscriber.stop()
+            self.notify_subscriber = None
+
+    def _start_channel_selection(self):
+        if self.channel_selection is None or self.channel_selector is not None:
+            return
+        self.channel_selector = ChannelSelector(self, **self.channel_selection)
+        self.channel_selector.start()
+
+    def _stop_channel_selection(self):
+        if self.channel_selector is not None:
+            self.channel_selector.stop()
+            self.channel_selector = None
+
+    def _on_notification(self, event):
+        if isinstance(event, WiFiPhyMacStatsEvent):
+            self.neighbor_table.update_stats(event.neighbors, event.timestamp)
+            if self.channel_selector is not None:
+                self.channel_selector.on_stats(event)
+            if self.auto_mtu:
+                try:
+                    self._update_link_fer(event)
+                except Exception as e:
+                    self.log.warning("MTU tuning failed: {}".format(e))
+        self.send_event(event)
+
+    def _update_link_fer(self, event):
+        # frame error rate of the frames received from the neighbors (gaps
+        # in their sequence numbers), taken for both directions of the
+        # link; the MTU is tuned once enough frames were seen
+        for mac, nb in event.neighbors.items():
+            if self.neighbor_table.get_by_mac(mac) is None:
+                continue
+            self._fer_frames += nb['rx_frames']
+            self._fer_lost += nb.get('rx_lost', 0)
+            self._fer_bytes += nb['rx_bytes']
+        if (not self._fer_frames or
+                self._fer_frames + self._fer_lost < mtu_model.FER_MIN_FRAMES):
+            return
+        fer = float(self._fer_lost) / (self._fer_frames + self._fer_lost)
+        fer_mtu = max(mtu_model.MIN_MTU, self._fer_bytes // self._fer_frames -
+                      mtu_model.psdu_length(0))
+        self._fer_frames = self._fer_lost = self._fer_bytes = 0
+        self.tune_mtu(fer, fer_mtu)
+
+    def report_peer_stats(self, peer_mac, neighbors):
+        # feedback for the TX power control: neighbors are the per-neighbor
+        # statistics of the peer (WiFiPhyMacStatsEvent.neighbors of the
+        # peer node, forwarded by the controller), the entry for our MAC
+        # holds the SNR the peer measured on our frames
+        nb = self.neighbor_table.get_by_mac(peer_mac)
+        stats = neighbors.get(normalize_mac(self.src_mac))
+        if nb is None or stats is None or stats.get('snr') is None:
+            return
+        nb.peer_snr = stats['snr']
+        nb.peer_snr_time = time.time()
+        if self.tx_power_controller is None:
+            return
+        try:
+            self._control_tx_power()
+        except Exception as e:
+            self.log.warning("TX power control failed: {}".format(e))
+
+    def _control_tx_power(self):
+        # the weakest neighbor with a recent report sets the power
+        deadline = time.time() - 3 * self.notify_interval
+        snrs = [nb.peer_snr for nb in self.neighbor_table
+                if nb.peer_snr is not None and nb.peer_snr_time >= deadline]
+        if not snrs:
+            return
+        if self.tx_power_dBm is None:
+            self.tx_power_dBm = self.get_tx_power(self.tap_iface)
+            if self.tx_power_dBm is None:
+                return
+        power = self.tx_power_controller.update(self.tx_power_dBm, min(snrs))
+        if power != self.tx_power_dBm:
+            self.set_tx_power(power, self.tap_iface)
+
+    def _update_arp(self, neighbors, delete=False):
+        if not self.tap_configured or not neighbors:
+            return
+        import sh
+        # one ip call for all entries
+        sh.ip("-force", "-batch", "-",
+              _in=neigh_batch(neighbors, self.tap_iface, delete))
+
+    def add_neighbors(self, neighbors):
+        # neighbors: {ipv4: mac} or list of (ipv4, mac)
+        if isinstance(neighbors, dict):
+            neighbors = neighbors.items()
+        changed = []
+        try:
+            for ipv4_address, mac in neighbors:
+                nb = self.neighbor_table.add(ipv4_address, mac)
+                if nb is not None:
+                    changed.append(nb)
+        finally:
+            # the entries added before an invalid one are kept
+            self.log.info('Adding {} neighbor(s)'.format(len(changed)))
+            self._update_arp(changed)
+
+    def remove_neighbors(self, ipv4_addresses):
+        removed = [nb for nb in map(self.neighbor_table.remove, ipv4_addresses)
+                   if nb is not None]
+
+        self.log.info('Removing {} neighbor(s)'.format(len(removed)))
+        self._update_arp(removed, delete=True)
+
+    def get_neighbors(self):
+        return [nb.to_dict() for nb in self.neighbor_table]
+
+    def get_neighbor(self, ipv4_address):
+        nb = self.neighbor_table.get(ipv4_address)
+        if nb is None:
+            return None
+        return nb.to_dict()
 
     def set_channel(self, channel, ifaceName):
+        import pyric.utils.channels as channels
         # convert channel to freq
         freq = channels.ch2rf(channel)
 
@@ -113,6 +533,7 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
         self.set_parameters(inval)
 
     def get_channel(self, ifaceName):
+        import pyric.utils.channels as channels
 
         self.log.info('Getting channel for {}:{}'
                       .format(ifaceName, self.device))
@@ -130,9 +551,24 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
 
         return ch
 
+    def _get_freq(self):
+        freq = self.get_parameters(['freq'])
+        if freq == None:
+            return None
+        return float(freq['freq'])
+
     def set_tx_power(self, power_dBm, ifaceName):
-        # TODO convert power_dBm to tx power of USRP
-        power_usrp = power_dBm
+        if self.tx_calibration is not None:
+            freq = self._get_freq()
+            if freq is None:
+                self.log.warning('TX power not set, frequency unknown')
+                return
+            power_usrp = float(self.tx_calibration.to_gain(freq, power_dBm))
+            # the power applied, power_dBm is clamped to the calibration
+            self.tx_power_dBm = float(self.tx_calibration.to_dbm(freq, power_usrp))
+        else:
+            # uncalibrated, the value is used as normalized gain
+            power_usrp = power_dBm
 
         self.log.info('Setting power on iface {}:{} to {}'
                       .format(ifaceName, self.device, str(power_usrp)))
@@ -149,9 +585,15 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
         gvals = ['tx_gain']
         # delegate to generic function
         tx_gain = self.get_parameters(gvals)
+        if tx_gain == None:
+            return None
 
-        # TODO convert to dBm
-        tx_gain_dBm = tx_gain
+        if self.tx_calibration is None:
+            return float(tx_gain['tx_gain'])
+        freq = self._get_freq()
+        if freq is None:
+            return None
+        tx_gain_dBm = float(self.tx_calibration.to_dbm(freq, float(tx_gain['tx_gain'])))
 
         return tx_gain_dBm
 
@@ -175,8 +617,15 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
         return samp_rate
 
     def set_rx_gain(self, rx_gain_dBm, ifaceName):
-        # TODO convert power_dBm to tx power of USRP
-        rx_gain = rx_gain_dBm
+        if self.rx_calibration is not None:
+            freq = self._get_freq()
+            if freq is None:
+                self.log.warning('RX gain not set, frequency unknown')
+                return
+            rx_gain = float(self.rx_calibration.to_gain(freq, rx_gain_dBm))
+        else:
+            # uncalibrated, the value is used as normalized gain
+            rx_gain = rx_gain_dBm
 
         self.log.info('Setting rx gain on iface {}:{} to {}'
                       .format(ifaceName, self.device, str(rx_gain)))
@@ -192,12 +641,162 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
         gvals = ['rx_gain']
         # delegate to generic function
         rx_gain = self.get_parameters(gvals)
+        if rx_gain == None:
+            return None
 
-        # TODO convert to dBm
-        rx_gain_dBm = rx_gain
+        if self.rx_calibration is None:
+            return float(rx_gain['rx_gain'])
+        freq = self._get_freq()
+        if freq is None:
+            return None
+        rx_gain_dBm = float(self.rx_calibration.to_dbm(freq, float(rx_gain['rx_gain'])))
 
         return rx_gain_dBm
 
+    def set_loopback_channel(self, noise_voltage=None, freq_offset=None,
+                             taps=None, interferers=None):
+        if self.loopback is None:
+            self.log.warning('Not running on a loopback channel')
+            return
+
+        self.log.info('Setting loopback channel noise={} cfo={} taps={}'
+                      .format(noise_voltage, freq_offset, taps))
+
+        inval = {}
+        if noise_voltage is not None:
+            inval['chan_noise_voltage'] = noise_voltage
+        if freq_offset is not None:
+            inval['chan_freq_offset'] = freq_offset
+        if taps is not None:
+            # XML-RPC does not marshal complex values, real taps only
+            inval['chan_taps'] = [float(t) for t in taps]
+        if interferers is not None:
+            # {channel: (duty_cycle, amplitude)}, only if the flow graph
+            # was built with interferers
+            if not self.loopback.interferers:
+                raise ValueError("Loopback channel built without interferers")
+            inval['chan_interferers'] = LoopbackChannel.interferer_list(interferers)
+        # delegate to generic function
+        self.set_parameters(inval)
+
+    def capture_iq(self, n_samples, timeout=5.0, analyze=True,
+                   noise_floor_db=None):
+        # returns (samples, summary); samples is a read-only view on the
+        # snapshot buffer, valid until the next capture. The summary is
+        # relative to noise_floor_db (default: the floor measured by the
+        # channel selection, if running; else estimated from the snapshot)
+        if not self.iq_capture_size:
+            raise ValueError("IQ capture disabled (iq_capture_size=0)")
+        min_samples = 1
+        if analyze:
+            from .iq import NFFT, WINDOW
+            min_samples = max(NFFT, WINDOW)
+        if not min_samples <= n_samples <= self.iq_capture_size:
+            raise ValueError("n_samples {} out of range [{}, {}]"
+                             .format(n_samples, min_samples,
+                                     self.iq_capture_size))
+        if not self.iq_buffer.exists():
+            self.log.warning('IQ snapshot buffer {} not available'
+                             .format(self.iq_buffer.path))
+            return None, None
+
+        # no other capture may be armed between reading the sequence
+        # number and the end of the analysis
+        with _capture_locks[self.iq_capture_path]:
+            seq = self.iq_buffer.seq() + 1
+            self.set_parameters({'iq_capture': n_samples})
+            samples = self.iq_buffer.wait(seq, timeout)
+            if samples is None:
+                self.log.warning('IQ capture timed out after {}s'.format(timeout))
+                return None, None
+            if not analyze:
+                return samples, None
+
+            samp_rate = self.get_parameters(['samp_rate'])
+            samp_rate = float(samp_rate['samp_rate']) if samp_rate else mtu_model.SAMP_RATE
+            if noise_floor_db is None and self.channel_selector is not None:
+                noise_floor_db = self.channel_selector.noise_floor_db
+            from .iq import analyze as analyze_iq
+            summary = analyze_iq(samples, samp_rate,
+                                 noise_floor_db=noise_floor_db)
+            summary['samp_rate'] = samp_rate
+            summary['n_samples'] = len(samples)
+            return samples, summary
+
+    def get_channel_selection_report(self):
+        if self.channel_selector is None:
+            return []
+        return list(self.channel_selector.report)
+
+    def set_encoding(self, encoding, ifaceName=None):
+        self.log.info('Setting encoding on iface {}:{} to {}'
+                      .format(ifaceName, self.device, encoding))
+
+        inval = {}
+        inval['encoding'] = encoding
+        # delegate to generic function
+        self.set_parameters(inval)
+
+        if self.auto_mtu:
+            self.tune_mtu(encoding=encoding)
+
+    def get_encoding(self, ifaceName=None):
+        self.log.debug("getting encoding of interface: {}".format(ifaceName))
+
+        gvals = ['encoding']
+        # delegate to generic function
+        encoding = self.get_parameters(gvals)
+        if encoding == None:
+            return None
+
+        return int(encoding['encoding'])
+
+    def set_mtu(self, mtu, mss=None, ifaceName=None):
+        if not mtu_model.MIN_MTU <= mtu <= self.max_mtu:
+            raise ValueError("MTU {} out of range [{}, {}]"
+                             .format(mtu, mtu_model.MIN_MTU, self.max_mtu))
+
+        self.mtu = mtu
+        self.mss = mss if mss is not None else mtu_model.mss_for_mtu(mtu)
+
+        self.log.info('Setting MTU/MSS on iface {} to {}/{}'
+                      .format(self.tap_iface, self.mtu, self.mss))
+
+        # before activation the values are applied with the tap device
+        if self.tap_configured:
+            import sh
+            sh.ifconfig(self.tap_iface, "mtu", self.mtu)
+            self._configure_route()
+
+    def get_mtu(self, ifaceName=None):
+        return self.mtu
+
+    def get_mss(self, ifaceName=None):
+        return self.mss
+
+    def tune_mtu(self, fer=None, fer_mtu=None, encoding=None):
+        # select the MTU maximizing the goodput for the encoding and the
+        # link quality, i.e. the frame error rate fer measured with frames
+        # of fer_mtu bytes (default: last values given or, with auto_mtu,
+        # measured from the notifier statistics)
+        if fer is not None:
+            self.link_fer = fer
+            self.link_fer_mtu = fer_mtu if fer_mtu is not None else self.mtu
+        if encoding is None:
+            encoding = self.get_encoding()
+            if encoding is None:
+                return self.mtu
+        samp_rate = self.get_parameters(['samp_rate'])
+        samp_rate = float(samp_rate['samp_rate']) if samp_rate else mtu_model.SAMP_RATE
+
+        mtu = mtu_model.best_mtu(encoding, self.link_fer, self.link_fer_mtu,
+                                 samp_rate,
+                                 candidates=range(mtu_model.MIN_MTU,
+                                                  self.max_mtu + 1))
+        if mtu != self.mtu:
+            self.set_mtu(mtu)
+        return mtu
+
     def _convert_mac(self, mac):
         return str(list(map(lambda x: hex(int(x, 16)), mac.split(":"))))
 
@@ -215,17 +814,18 @@ class WiFiGnuRadioModule(uniflex_module_gnuradio.GnuRadioModule):
         return src_mac
 
     def set_dst_mac(self, mac_addr, ifaceName=None):
+        # frames are addressed through the neighbor table, the DST MAC is
+        # the one of the neighbor dst_ipv4_address
         self.log.info('Set DST MAC address to {}'.format(mac_addr))
-        mac_addr = self._convert_mac(mac_addr)
-        inval = {}
-        inval['dst_mac'] = mac_addr
-        self.set_parameters(inval)
+        self.add_neighbors({self.dst_ipv4_address: mac_addr})
+        self.dst_mac = mac_addr
 
     def get_dst_mac(self, ifaceName=None):
         self.log.info('Get DST MAC address')
-        gvals = ['dst_mac']
-        dst_mac = self.get_parameters(gvals)
-        return dst_mac
+        nb = self.neighbor_table.get(self.dst_ipv4_address)
+        if nb is None:
+            return None
+        return nb.mac
 
     def set_bss_mac(self, mac_addr, ifaceName=None):
         self.log.info('Set BSS MAC address to {}'.format(mac_addr))